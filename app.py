@@ -1,178 +1,58 @@
 import streamlit as st
-import pandas as pd
+import numpy as np
 from dashboard import (
-    dataset,
-    demographic,
-    financial,
-    mental,
-    nutritional,
-    physical,
-    sleep,
-    clinical,
+    backends,
+    cube,
     filters,
+    flags,
+    index,
+    memo,
+    schema,
+    snapshot,
+    storage,
 )
+from dashboard.categories import CATEGORIES
 
 
 ##  Data Preparation
-@st.cache_data
-def load_data():
-    return pd.read_csv("processed.csv")
-
-
-df = load_data()
-filtered_df = filters.show(df)
-
-# Demographic DataFrame
-demo_columns = [
-    "age",
-    "education_level",
-    "work_model",
-    "marital_status",
-    "biological_sex",
-    "health_insurance",
-    "self_eval_health_quality",
-    "self_eval_health_general",
-]
-demographic_df = filtered_df[demo_columns]
-
-# Physical Health DataFrame
-physical_columns = [
-    "height",
-    "weight",
-    "bmi",
-    "bmi_category",
-    "healthy_weight",
-    "obesity",
-    "physical_activities",
-    "active",
-    "sedentary",
-    "headache",
-    "headache_weekly",
-    "migraine",
-    "back_pain_weekly",
-    "body_pain_weekly",
-    "sit_down_time_daily",
-    "excessive_sit_down_time",
-]
-physical_df = filtered_df[physical_columns]
-
-# Sleep Health DataFrame
-sleep_columns = [
-    "self_eval_sleep_quality",
-    "sleep_hours",
-    "apnea",
-    "sleepness_day_time",
-    "wake_up_tired",
-    "sleep_break",
-    "snore",
-    "insomnia",
-]
-sleep_df = filtered_df[sleep_columns]
-
-# Mental Health DataFrame
-mental_columns = [
-    "self_eval_mental_well_being",
-    "burnout",
-    "forgetfulness",
-    "work_satisfaction",
-    "suicide_risk",
-    "anxiety",
-    "depression",
-    "is_isolated",
-    "is_socially_active",
-    "isolation",
-    "low_quality_of_life",
-    "meaningful_life",
-    "meaningless_life",
-    "socialization",
-    "spirituality",
-    "household_situation_alone",
-    "household_situation_adults",
-    "household_situation_parents",
-    "household_situation_partner",
-    "household_situation_pet",
-]
-mental_df = filtered_df[mental_columns]
-
-# Nutritional Health Dataframe
-nutritional_columns = [
-    "self_eval_nutrition",
-    "self_eval_nutrition_well_being",
-    "fast_food",
-    "fibers",
-    "fruits",
-    "processed",
-    "soft_drink",
-    "vegetables",
-    "water_intake",
-    "eat_fibers",
-    "eat_fruits",
-    "eat_vegetables",
-    "good_water_intake",
-    "high_fast_food_intake",
-    "high_processed_intake",
-    "high_sodium_intake",
-    "high_soft_drink_intake",
-    "high_cholesterol",
-]
-nutritional_df = filtered_df[nutritional_columns]
-
-# Financial Health DataFrame
-financial_columns = [
-    "self_eval_finance_well_being",
-    "debt",
-    "emergency_reserve",
-    "emergency_reserve_savings_period",
-    "investments",
-    "savings_money",
-    "unexpected_expenses",
-]
-financial_df = filtered_df[financial_columns]
-
-# Clinical DataFrame
-clinical_columns = [
-    "age",
-    "years_lost",
-    "heart_age",
-    "bowel_movements",
-    "constipation",
-    "smoker",
-    "quit_smoking",
-    "use_medication",
-    "polypharmacy",
-    "medication_antidepressants",
-    "medication_antipsychotics",
-    "medication_anxiolytic",
-    "medication_for_sleep",
-    "medication_for_weight_loss",
-    "appointments_dentist",
-    "appointments_generalist",
-    "appointments_nutritionist",
-    "appointments_psychologist",
-    "clean_family_history",
-    "clean_medical_history",
-    "high_cvd_risk",
-    "high_cholesterol",
-    "diabetes",
-    "diabetes_lack_exams",
-    "lack_exams_general",
-    "cancer_lack_exams",
-    "cardio_lack_exams",
-]
-clinical_df = filtered_df[clinical_columns]
-
-## Configure Categories
-categories = [
-    {"name": "Demographic", "fn": demographic.show, "df": demographic_df},
-    {"name": "Clinical Health", "fn": clinical.show, "df": clinical_df},
-    {"name": "Physical Health", "fn": physical.show, "df": physical_df},
-    {"name": "Sleep Health", "fn": sleep.show, "df": sleep_df},
-    {"name": "Mental Health", "fn": mental.show, "df": mental_df},
-    {"name": "Nutritional Health", "fn": nutritional.show, "df": nutritional_df},
-    {"name": "Financial Health", "fn": financial.show, "df": financial_df},
-    {"name": "Dataset", "fn": dataset.show, "df": df},
-]
+# One store per process, shared by every session and rerun: the mapped
+# snapshot when the image has one, the lazily loaded dataset otherwise
+@st.cache_resource
+def load_dataset():
+    return snapshot.load()
 
+
+def load_data(columns):
+    return load_dataset()[columns]
+
+
+# Cache shared with the other replicas, when DASHBOARD_CACHE names one
+@st.cache_resource
+def load_backend():
+    return backends.connect()
+
+
+memo.CACHE.backend = load_backend()
+
+
+# Rebuilt only when the ETL changes the dataset
+@st.cache_resource(max_entries=1)
+def load_filters(version):
+    built = getattr(load_dataset(), "index", None)
+    return filters.FilterEngine(
+        index.FilterIndex(load_data(index.COLUMNS)) if built is None else built,
+        version=version,
+        backend=load_backend(),
+    )
+
+
+# Boolean flags packed to bits, packed per column on first use
+@st.cache_resource(max_entries=1)
+def load_flags(version):
+    return flags.FlagStore(load_dataset(), schema.BOOL_COLUMNS)
+
+
+selection = filters.show(load_filters(load_dataset().version))
 ## Display the dashboard
 st.markdown("""
 # Health Survey Dashboard
@@ -181,7 +61,7 @@ Welcome to this interactive dashboard designed to explore responses from a large
 
 ---
 ### 🔍 Dashboard Structure
-Use the tabs below to explore different dimensions of the data:
+Use the selector below to explore different dimensions of the data:
 
 - **Demographics**: Understand the respondents: age, sex, education, marital status, work model, insurance, and their self-assessed quality of life and well-being.
 - **Health Blocks**: Analyze participants' perceptions of their health and their self-reported responses across multiple health domains.
@@ -190,8 +70,46 @@ Use the tabs below to explore different dimensions of the data:
 
 """)
 
-tabs = st.tabs([cat["name"] for cat in categories])
 
-for tab, cat in zip(tabs, categories):
-    with tab:
-        cat["fn"](cat["df"])
+# Filtered counts come from one count cube per category, built the first time
+# the category is rendered and rebuilt only when the dataset changes
+@st.cache_resource(max_entries=len(CATEGORIES))
+def load_cube(version, name):
+    built = getattr(load_dataset(), "cubes", {})
+    if name in built:
+        return built[name]
+    columns = next(cat["columns"] for cat in CATEGORIES if cat["name"] == name)
+    return cube.CountCube(load_data(list(dict.fromkeys(cube.DIMENSIONS + columns))))
+
+
+# Widgets of a category that is not rendered would lose their state; setting
+# them again each run keeps chart controls as they were when switching back
+for key in list(st.session_state):
+    if key not in [spec["key"] for spec in filters.FILTERS]:
+        st.session_state[key] = st.session_state[key]
+
+# Only the selected category runs, so a rerun costs one category's charts
+active = st.radio(
+    "Category",
+    [cat["name"] for cat in CATEGORIES],
+    horizontal=True,
+    key="category",
+    label_visibility="collapsed",
+)
+cat = next(cat for cat in CATEGORIES if cat["name"] == active)
+
+if cat["columns"] is None:
+    cat["fn"](load_dataset())
+else:
+    version = load_dataset().version
+    cohort = cube.Cohort(
+        load_cube(version, cat["name"]),
+        selection.key,
+        selection.count,
+        load_flags(version),
+        selection.bits,
+        version,
+    )
+    # Charts read filtered columns on demand instead of a copied frame
+    rows = np.flatnonzero(selection.mask)
+    cat["fn"](storage.CategoryView(load_dataset(), cat["columns"], rows, cohort))
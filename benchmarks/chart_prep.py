@@ -0,0 +1,128 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from dashboard import cube, derived, filters, flags, index, memo, schema, storage
+from dashboard import aggregate, clinical, physical
+
+# The data-prep calls behind the Physical and Clinical Health tabs
+COLUMNS = [
+    "activity_level",
+    "active",
+    "sedentary",
+    "sitting_time",
+    "excessive_sit_down_time",
+    "back_pain_weekly",
+    "body_pain_weekly",
+    "headache_weekly",
+    "years_lost",
+    "smoker",
+    "smoking_status",
+    "quit_status",
+    "constipation",
+    "use_medication",
+    "polypharmacy",
+    "medication_antidepressants",
+]
+
+
+def prepare(view):
+    physical.activity_shares(view)
+    physical.sitting_shares(view)
+    for col in ["back_pain_weekly", "body_pain_weekly", "headache_weekly"]:
+        aggregate.distribution(view, col, normalize=True)
+    aggregate.mean_by_age(view, "years_lost")
+    aggregate.value_counts(view, "smoking_status", normalize=True)
+    clinical.quit_intention(view)
+    aggregate.mapped_counts(
+        view, "constipation", {True: "Constipated", False: "Not"}, normalize=True
+    )
+    aggregate.yes_no(
+        view,
+        {
+            "use_medication": "Uses",
+            "polypharmacy": "5+",
+            "medication_antidepressants": "AD",
+        },
+    )
+
+
+def load(rows: int) -> pd.DataFrame:
+    # `rows` respondents resampled from the stored survey
+    stored = [col for col in COLUMNS if col not in derived.COLUMNS]
+    sources = [
+        derived.COLUMNS[col]["source"] for col in COLUMNS if col in derived.COLUMNS
+    ]
+    base = storage.read(list(dict.fromkeys(index.COLUMNS + stored + sources)))
+    rng = np.random.default_rng(0)
+    df = schema.apply(base.iloc[rng.integers(0, len(base), rows)])
+    df = df.reset_index(drop=True)
+    for col in COLUMNS:
+        if col in derived.COLUMNS:
+            df[col] = derived.compute(col, df[derived.COLUMNS[col]["source"]])
+    return df
+
+
+def states(engine: filters.FilterEngine, count: int, reruns: int) -> list:
+    # Viewers mostly look at everyone; the rest pick one of a few age ranges
+    rng = np.random.default_rng(1)
+    low, high = engine.options(filters.FILTERS[1])
+    picked = [{}] + [
+        {"age": (int(a), int(a) + 10)} for a in rng.integers(low, high - 10, count - 1)
+    ]
+    others = 0.5 / (len(picked) - 1)
+    picks = rng.choice(len(picked), reruns, p=[0.5] + [others] * (len(picked) - 1))
+    return [picked[pick] for pick in picks]
+
+
+def structures(df: pd.DataFrame) -> tuple:
+    # What a replica builds once at start: the count cube and packed flags
+    counts = cube.CountCube(df[list(dict.fromkeys(cube.DIMENSIONS + COLUMNS))])
+    return counts, flags.FlagStore(df, schema.BOOL_COLUMNS)
+
+
+def views(df: pd.DataFrame, engine: filters.FilterEngine, reruns: list, built):
+    counts, store = built
+    for state in reruns:
+        selection = engine.select(state)
+        cohort = cube.Cohort(
+            counts, selection.key, selection.count, store, selection.bits, "v1"
+        )
+        rows = np.flatnonzero(selection.mask)
+        yield storage.CategoryView(df, COLUMNS, rows, cohort)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Chart data prep per rerun, with and without the prep cache"
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--reruns", type=int, default=200)
+    parser.add_argument("--states", type=int, default=20)
+    args = parser.parse_args()
+
+    df = load(args.rows)
+    engine = filters.FilterEngine(index.FilterIndex(df[index.COLUMNS]))
+    reruns = states(engine, args.states, args.reruns)
+    built = structures(df)
+
+    # A zero budget keeps nothing, so every call computes
+    for name, budget in [("no cache", 0), ("prep cache", 64)]:
+        memo.CACHE = memo.PrepCache(max_mb=budget)
+        start = time.perf_counter()
+        for view in views(df, engine, reruns, built):
+            prepare(view)
+        elapsed = (time.perf_counter() - start) / args.reruns * 1000
+        print(
+            f"{args.rows:>10} rows  {name:>10}: {elapsed:8.2f} ms per rerun  "
+            f"hits {memo.CACHE.hits:>5}  misses {memo.CACHE.misses:>4}  "
+            f"{memo.CACHE.nbytes / 2**10:7.1f} KB held"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import plotly.io as pio
+from dashboard import derived, physical, schema, sleep, storage
+
+COLUMNS = ["height", "weight", "bmi", "bmi_category", "sleep_hours"]
+
+
+def measure(make, repeat: int) -> tuple:
+    # Figure build plus the JSON st.plotly_chart sends to the browser
+    payload = pio.to_json(make(), validate=False)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pio.to_json(make(), validate=False)
+    return (time.perf_counter() - start) / repeat * 1000, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Point-level charts per level of detail: build time and payload"
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1_000, 20_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = storage.read(COLUMNS)
+    rng = np.random.default_rng(0)
+    for rows in args.rows:
+        df = schema.apply(base.iloc[rng.integers(0, len(base), rows)])
+        df = df.reset_index(drop=True)
+        df["bmi_label"] = derived.compute("bmi_label", df["bmi_category"])
+        charts = [("bmi", physical.bmi_figure), ("sleep", sleep.sleep_figure)]
+        for name, figure in charts:
+            cells = []
+            for mode in ["points", "webgl", "summary"]:
+                if mode == "points" and rows > 100_000:
+                    cells.append(f"{mode} {'skipped':>22}")
+                    continue
+                ms, size = measure(lambda: figure(df, mode), args.repeat)
+                cells.append(f"{mode} {ms:8.1f} ms {size / 2**10:9.1f} KB")
+            print(f"{rows:>9} rows {name:>5}:  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import etl
+from dashboard import schema, storage
+
+
+def chunk(rows: int, late: bool) -> pd.DataFrame:
+    # Undeclared columns as the ETL meets them: later chunks hold values the
+    # first one never showed
+    rng = np.random.default_rng(int(late))
+    return pd.DataFrame(
+        {
+            "extra_count": rng.integers(0, 2, rows) + (300 if late else 0),
+            "extra_empty": np.nan if not late else rng.uniform(0, 10, rows),
+            "extra_flag": pd.Series(rng.integers(0, 2, rows) == 1, dtype=object),
+            "extra_label": rng.choice(["a", "b"], rows),
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Dtypes fixed from the first ETL chunk hold for later chunks "
+        "and for every partition read back"
+    )
+    parser.add_argument("--rows", type=int, default=3_000)
+    args = parser.parse_args()
+
+    first, later = chunk(args.rows, False), chunk(args.rows, True)
+    first.loc[::7, "extra_flag"] = None
+    dtypes = schema.dtypes(first, sample=True)
+    for df in [first, later]:
+        etl.typed_table(df, dtypes)
+    assert dtypes["extra_count"] != "boolean", dtypes
+    assert dtypes["extra_flag"] == "boolean", dtypes
+    # Read back whole, 0/1 counts stay numbers
+    assert schema.infer(first["extra_count"]) == "Int8"
+    print("first chunk dtypes hold for later chunks:", dtypes)
+
+    # Read back per partition: each one alone would infer its own width
+    widths = {schema.infer(df["extra_count"]) for df in [first, later]}
+    assert widths == {"Int8", "Int16"}, widths
+    with tempfile.TemporaryDirectory() as tmp:
+        for n, df in enumerate([first, later]):
+            pq.write_table(etl.typed_table(df, dtypes), f"{tmp}/part-{n}.parquet")
+        etl.save_state(tmp, {"watermark": None, "dtypes": dtypes})
+        stored = storage.load_state(tmp)["dtypes"]
+        parts = [storage.read(None, file, stored) for file in storage.files(tmp)]
+        whole = storage.LazyDataset(tmp)[list(first.columns)]
+        for df in [*parts, whole]:
+            found = {col: str(dtype) for col, dtype in df.dtypes.items()}
+            assert found == dtypes, found
+    print("every partition is read with the stored dtypes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+from dashboard import cube, figures, graph
+
+TITLE = "Self-Evaluated Mental Well-Being (Scale: -5 to 5)"
+LABELS = ["Anxiety", "Depression", "Burnout", "Forgetfulness", "Low Quality of Life"]
+
+
+def stacked(rng) -> pd.DataFrame:
+    yes = rng.uniform(0, 100, len(LABELS)).round(1)
+    return pd.DataFrame(
+        {
+            "Label": pd.Categorical(LABELS * 2, categories=LABELS, ordered=True),
+            "Response": ["Yes"] * len(LABELS) + ["No"] * len(LABELS),
+            "Percent": np.concatenate([yes, 100 - yes]),
+        }
+    )
+
+
+def build_stacked(plot_df):
+    fig = px.bar(
+        plot_df,
+        y="Label",
+        x="Percent",
+        color="Response",
+        barmode="stack",
+        orientation="h",
+        text="Percent",
+        color_discrete_map={"Yes": "#e15759", "No": "#bab0ac"},
+        title="Reported Mental Health Symptoms",
+    )
+    fig.update_traces(texttemplate="%{text:.1f}%", textposition="inside")
+    return fig
+
+
+def scores(rng) -> pd.DataFrame:
+    counts = pd.DataFrame({"Score": range(-5, 6)})
+    counts["Percentage"] = (rng.dirichlet(np.ones(11)) * 100).round(1)
+    counts["Color"] = counts["Score"].apply(
+        lambda x: "#e15759" if x < 0 else "#59a14f" if x > 0 else "#bab0ac"
+    )
+    return counts
+
+
+def shape_lollipop(counts):
+    # What the well-being charts drew before: a marker trace plus a shape
+    # per score
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=counts["Score"],
+            y=counts["Percentage"],
+            mode="lines+markers",
+            line=dict(color="rgba(0,0,0,0)"),
+            marker=dict(
+                size=12, color=counts["Color"], line=dict(width=1, color="black")
+            ),
+            hovertemplate="Score: %{x}<br>%{y:.1f}%",
+            showlegend=False,
+        )
+    )
+    for _, row in counts.iterrows():
+        fig.add_shape(
+            type="line",
+            x0=row["Score"],
+            y0=0,
+            x1=row["Score"],
+            y1=row["Percentage"],
+            line=dict(color=row["Color"], width=2),
+        )
+    fig.update_layout(
+        title=TITLE,
+        xaxis=dict(dtick=1, title="Score", tickmode="linear"),
+        yaxis=dict(
+            title="Percentage of People", range=[0, counts["Percentage"].max() + 5]
+        ),
+        template="plotly_white",
+        height=400,
+        margin=dict(t=50, b=40, l=30, r=30),
+    )
+    return fig
+
+
+def timed(render, make, reruns: int, seed: int = 0) -> float:
+    rng = np.random.default_rng(seed)
+    frames = [make(rng) for _ in range(reruns + 1)]
+    render(frames[0])
+    start = time.perf_counter()
+    for frame in frames[1:]:
+        render(frame)
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+def unchanged(draw, make):
+    # A chart whose inputs (see graph.py) are the same every rerun
+    frame = make(np.random.default_rng(0))
+    view = SimpleNamespace(cohort=cube.Cohort(None, (), 0, None, None, "v1"))
+    chart = graph.node([])(lambda view: draw(frame))
+    return lambda _: chart(view)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Figure build + serialization per rerun: rebuilt, patched, "
+        "and sent unchanged"
+    )
+    parser.add_argument("--reruns", type=int, default=50)
+    args = parser.parse_args()
+    # Outside `streamlit run` every element call logs a warning
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    def rebuilt(build):
+        return lambda frame: st.plotly_chart(build(frame), use_container_width=True)
+
+    cases = [
+        (
+            "stacked bar",
+            stacked,
+            rebuilt(build_stacked),
+            lambda frame: figures.plot(
+                frame, build_stacked, group="Response", x="Percent", text="Percent"
+            ),
+        ),
+        (
+            "lollipop",
+            scores,
+            rebuilt(shape_lollipop),
+            lambda frame: figures.lollipop(frame, TITLE),
+        ),
+    ]
+    for name, make, before, after in cases:
+        old = timed(before, make, args.reruns)
+        new = timed(after, make, args.reruns)
+        same = timed(unchanged(after, make), make, args.reruns)
+        print(
+            f"{name:>12}: rebuilt {old:7.2f} ms  patched {new:7.2f} ms  "
+            f"unchanged {same:7.2f} ms per rerun"
+        )
+
+    frame = scores(np.random.default_rng(0))
+    shapes = len(pio.to_json(shape_lollipop(frame), validate=False))
+    figures.lollipop(frame, TITLE)
+    trace = max(
+        len(pio.to_json(fig, validate=False))
+        for (chart, _), fig in figures._figures.items()
+        if chart == ("lollipop", TITLE)
+    )
+    print(f"{'lollipop':>12}: payload {shapes} B with shapes, {trace} B as traces")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SLEEP_COLUMNS = [
+    "self_eval_sleep_quality",
+    "sleep_hours",
+    "apnea",
+    "sleepness_day_time",
+    "wake_up_tired",
+    "sleep_break",
+    "snore",
+    "insomnia",
+]
+
+
+def run(mode: str):
+    import pandas as pd
+    from dashboard import storage
+
+    start = time.perf_counter()
+    if mode == "csv":
+        df = pd.read_csv(storage.CSV_PATH)
+    elif mode == "parquet":
+        df = storage.read()
+    else:
+        df = storage.read(SLEEP_COLUMNS)
+    elapsed = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "seconds": round(elapsed, 3),
+                "frame_mb": round(df.memory_usage(deep=True).sum() / 2**20, 1),
+                # ru_maxrss is reported in KiB on Linux
+                "peak_rss_mb": round(
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10, 1
+                ),
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dataset load paths")
+    parser.add_argument("--mode", choices=["csv", "parquet", "projected"])
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode)
+        return
+
+    # Each mode runs in a fresh interpreter so peak RSS is not shared
+    for mode in ["csv", "parquet", "projected"]:
+        subprocess.run([sys.executable, __file__, "--mode", mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
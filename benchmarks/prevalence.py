@@ -0,0 +1,87 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from dashboard import aggregate, flags, schema, storage
+
+# The flags behind the Yes/No stacked bars of the health tabs
+FLAGS = [
+    "use_medication",
+    "polypharmacy",
+    "medication_antidepressants",
+    "medication_antipsychotics",
+    "medication_anxiolytic",
+    "medication_for_sleep",
+    "medication_for_weight_loss",
+    "appointments_generalist",
+    "appointments_dentist",
+    "anxiety",
+    "depression",
+    "burnout",
+    "forgetfulness",
+    "low_quality_of_life",
+    "debt",
+    "investments",
+    "savings_money",
+    "unexpected_expenses",
+]
+
+
+def per_column(df: pd.DataFrame) -> list:
+    # What each chart did before: one normalized value_counts per flag
+    shares = []
+    for col in FLAGS:
+        counts = df[col].value_counts(normalize=True).reindex([True, False])
+        shares.append(counts.fillna(0).to_numpy())
+    return shares
+
+
+def timed(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Yes/No shares of the health flags: per-column, one bool "
+        "block and packed bits"
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base = storage.read(FLAGS)
+    rng = np.random.default_rng(0)
+    for rows in args.rows:
+        df = schema.apply(base.iloc[rng.integers(0, len(base), rows)])
+        df = df.reset_index(drop=True)
+        rows_mask = rng.random(rows) < 0.5
+
+        loop = timed(lambda: per_column(df[rows_mask]), args.repeat)
+        kernel = timed(
+            lambda: aggregate.prevalence(df, FLAGS, rows_mask), args.repeat
+        )
+        store = flags.FlagStore(df, FLAGS)
+        selection = np.packbits(rows_mask)
+        packed = timed(lambda: store.counts(FLAGS, selection), args.repeat)
+        print(
+            f"{rows:>10} rows  per-column {loop:8.2f} ms  "
+            f"kernel {kernel:8.2f} ms  packed {packed:8.2f} ms"
+        )
+        pandas_mb = df.memory_usage(index=False).sum() / 2**20
+        print(
+            f"{'':>16}memory: boolean columns {pandas_mb:7.1f} MB  "
+            f"packed {store.nbytes / 2**20:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from dashboard import cube, filters, flags, index, schema, storage
+
+COLUMNS = ["age", "sleep_hours", "snore", "insomnia"]
+# Filter states the simulated sessions cycle through
+STATES = [{}, {"age": (30, 45)}, {}, {"biological_sex": ["Female"]}]
+# What one more session may hold, as a share of copying its tab's columns
+LIMIT = 0.05
+
+
+def session(df):
+    # What a rerun does with its tab: filter, slice, add a chart label
+    age = df["age"]
+    filtered = df[(age >= age.min()) & (age <= age.max())]
+    sleep_df = filtered[["sleep_hours", "snore", "insomnia"]]
+    sleep_df["snore_label"] = sleep_df["snore"].map({True: "Yes", False: "No"})
+    return df
+
+
+def cohorts(dataset) -> list:
+    # Rows and cohort of each filter state, as app.py builds them
+    version = dataset.version
+    engine = filters.FilterEngine(
+        index.FilterIndex(dataset[index.COLUMNS]), version=version
+    )
+    counts = cube.CountCube(dataset[list(dict.fromkeys(cube.DIMENSIONS + COLUMNS))])
+    store = flags.FlagStore(dataset, schema.BOOL_COLUMNS)
+    found = []
+    for state in STATES:
+        selection = engine.select(state)
+        cohort = cube.Cohort(
+            counts, selection.key, selection.count, store, selection.bits, version
+        )
+        found.append((np.flatnonzero(selection.mask), cohort))
+    return found
+
+
+def held(name: str, handle, sessions: int, step: int) -> float:
+    # Bytes each added session keeps, once every filter state has been seen
+    # (shared caches fill on first use). tracemalloc sees numpy buffers too,
+    # without the allocator slack that makes RSS noisy
+    kept = [session(handle(n)) for n in range(len(STATES))]
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for n in range(1, sessions + 1):
+        kept.append(session(handle(n)))
+        if n % step == 0:
+            grown = tracemalloc.get_traced_memory()[0] - start
+            print(f"{name:>16}: {n:>3} sessions  +{grown / 2**20:7.2f} MB")
+    grown = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return grown / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Memory held as simulated sessions are added; fails when "
+        "sessions sharing the dataset grow it by more than a small share of "
+        "a copy each"
+    )
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--step", type=int, default=10)
+    args = parser.parse_args()
+
+    # What app.py shares across sessions, with the tab's columns cached
+    dataset = storage.LazyDataset()
+    dataset[COLUMNS]
+    found = cohorts(dataset)
+
+    views = held(
+        "category view",
+        lambda n: storage.CategoryView(dataset, COLUMNS, *found[n % len(found)]),
+        args.sessions,
+        args.step,
+    )
+    copies = held(
+        "per-session copy",
+        lambda n: dataset[COLUMNS].copy(deep=True),
+        args.sessions,
+        args.step,
+    )
+    print(f"per session: views {views / 2**10:.1f} KB, copies {copies / 2**10:.1f} KB")
+    assert views <= LIMIT * copies, (
+        f"each session holds {views / copies:.0%} of a copy, "
+        f"more than {LIMIT:.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit.logger
+from chart_prep import load, prepare, states, structures, views
+from dashboard import backends, filters, index, memo
+
+
+class StandIn:
+    # An in-process stand-in for a Redis server: `get` and `set` with expiry
+    def __init__(self):
+        self.data = {}
+
+    def get(self, name):
+        value, expires = self.data.get(name, (None, 0))
+        return value if expires > time.time() else None
+
+    def set(self, name, value, ex=None):
+        self.data[name] = (value, time.time() + (ex or float("inf")))
+
+
+def replica(df, reruns: list, built, backend) -> float:
+    # A freshly started replica: empty in-process caches, maybe a shared one.
+    # Building the count cube is left out: it is the same either way
+    memo.CACHE = memo.PrepCache(backend=backend)
+    engine = filters.FilterEngine(
+        index.FilterIndex(df[index.COLUMNS]), version="v1", backend=backend
+    )
+    start = time.perf_counter()
+    for view in views(df, engine, reruns, built):
+        prepare(view)
+    return (time.perf_counter() - start) / len(reruns) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="A cold replica's first reruns, alone and with a shared cache"
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--states", type=int, default=20)
+    args = parser.parse_args()
+    streamlit.logger.set_log_level("error")
+
+    df = load(args.rows)
+    engine = filters.FilterEngine(index.FilterIndex(df[index.COLUMNS]))
+    # Every filter state once, as the first viewers of a replica would
+    reruns = list({repr(s): s for s in states(engine, args.states, 1000)}.values())
+    built = structures(df)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = backends.Shared(backends.SQLiteBackend(os.path.join(tmp, "c.db")))
+        redis = backends.Shared(backends.RedisBackend(StandIn()))
+        cases = [("no shared cache", None), ("sqlite", sqlite), ("redis", redis)]
+        for name, backend in cases:
+            first = replica(df, reruns, built, backend)
+            if backend is None:
+                print(f"{name:>16}: cold {first:8.2f} ms per state")
+                continue
+            # Another replica did the work: this one reads it
+            second = replica(df, reruns, built, backend)
+            print(
+                f"{name:>16}: first replica {first:8.2f} ms, "
+                f"next replica {second:8.2f} ms per state  "
+                f"(shared hits {backend.hits}, misses {backend.misses})"
+            )
+
+
+if __name__ == "__main__":
+    main()
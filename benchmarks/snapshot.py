@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dashboard import cube, filters, index, snapshot, storage
+from dashboard.categories import CATEGORIES
+
+
+def start(dataset) -> float:
+    # What a replica needs before it can draw the default view of the first
+    # category: the filter index, the default selection and the cube
+    began = time.perf_counter()
+    built = getattr(dataset, "index", None)
+    if built is None:
+        built = index.FilterIndex(dataset[index.COLUMNS])
+    filters.FilterEngine(built).select({})
+    cat = CATEGORIES[0]
+    counts = getattr(dataset, "cubes", {}).get(cat["name"])
+    if counts is None:
+        counts = cube.CountCube(
+            dataset[list(dict.fromkeys(cube.DIMENSIONS + cat["columns"]))]
+        )
+    return time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replica start to first category: store vs mapped snapshot"
+    )
+    parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.bin")
+        began = time.perf_counter()
+        snapshot.build(storage.LazyDataset(max_mb=float("inf")), path)
+        print(f"build    {time.perf_counter() - began:8.2f} s")
+        print(f"store    {start(storage.LazyDataset()):8.2f} s")
+        began = time.perf_counter()
+        mapped = snapshot.SnapshotDataset(path)
+        opened = time.perf_counter() - began
+        print(f"snapshot {opened + start(mapped):8.2f} s  (open {opened:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from dashboard import aggregate, schema, storage
+
+SYMPTOMS = [
+    "apnea",
+    "sleepness_day_time",
+    "wake_up_tired",
+    "sleep_break",
+    "snore",
+    "insomnia",
+]
+
+
+def melted(df: pd.DataFrame) -> pd.Series:
+    # What sleep_disturbances did before: a 6 x N long frame, then counting
+    long = df[SYMPTOMS].melt(var_name="Symptom", value_name="Present")
+    return long[long["Present"] == True]["Symptom"].value_counts(normalize=True)
+
+
+def direct(df: pd.DataFrame) -> pd.Series:
+    return aggregate.symptoms(df, SYMPTOMS)["mentions"]
+
+
+def measure(fn, df: pd.DataFrame, repeat: int) -> tuple:
+    fn(df)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(df)
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    tracemalloc.start()
+    fn(df)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sleep symptom prevalence: melt vs direct aggregation"
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = storage.read(SYMPTOMS)
+    rng = np.random.default_rng(0)
+    for rows in args.rows:
+        df = schema.apply(base.iloc[rng.integers(0, len(base), rows)])
+        df = df.reset_index(drop=True)
+        before = measure(melted, df, args.repeat)
+        after = measure(direct, df, args.repeat)
+        assert np.allclose(melted(df).reindex(SYMPTOMS).fillna(0), direct(df))
+        print(
+            f"{rows:>10} rows  melt {before[0]:9.2f} ms {before[1]:8.1f} MB peak  "
+            f"direct {after[0]:9.2f} ms {after[1]:8.1f} MB peak"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+from .memo import prepared
+from .schema import SCALES
+
+
+def cohort(df: pd.DataFrame):
+    # Set on a tab's CategoryView; plain frames and chart-local subsets (e.g.
+    # smokers only) have none and are counted from their rows
+    return getattr(df, "cohort", None)
+
+
+def cube(df: pd.DataFrame):
+    # The tab's count cube, when it is grouped by every filter the cohort
+    # narrowed; otherwise the selected rows are counted
+    found = cohort(df)
+    if found is not None and found.cube.covers(found.key):
+        return found.cube
+    return None
+
+
+@prepared
+def value_counts(df: pd.DataFrame, col: str, normalize: bool = False) -> pd.Series:
+    found = cube(df)
+    if found is not None and col in found.metrics:
+        return found.value_counts(col, df.cohort.key, normalize)
+    return df[col].value_counts(normalize=normalize)
+
+
+@prepared
+def distribution(df: pd.DataFrame, col: str, normalize: bool = False) -> pd.Series:
+    # Counts over the declared scale of `col`, in scale order and indexed by
+    # label, including answers nobody gave. One bincount over the codes; the
+    # labels are only attached to the result
+    table = SCALES[col]
+    found = cube(df)
+    if found is not None and col in found.metrics:
+        cells = found.cells(col, df.cohort.key)[:-1]
+        counts = pd.Series(cells, index=found.values[col])
+    elif isinstance(df[col].dtype, pd.CategoricalDtype):
+        codes = df[col].cat.codes.to_numpy()
+        categories = df[col].cat.categories
+        cells = np.bincount(codes[codes >= 0], minlength=len(categories))
+        counts = pd.Series(cells, index=categories)
+    else:
+        values = df[col].dropna().to_numpy(dtype=np.int64)
+        low = values.min() if len(values) else 0
+        cells = np.bincount(values - low)
+        counts = pd.Series(cells, index=range(low, low + len(cells)))
+    counts = counts.reindex(list(table), fill_value=0)
+    counts.index = pd.Index(list(table.values()), name=col)
+    if normalize:
+        counts = counts / max(counts.sum(), 1)
+    return counts
+
+
+@prepared
+def mean_by_age(df: pd.DataFrame, col: str) -> pd.Series:
+    found = cube(df)
+    if found is not None and col in found.sums:
+        return found.mean_by_age(col, df.cohort.key)
+    return df[["age", col]].groupby("age")[col].mean()
+
+
+@prepared
+def mapped_counts(
+    df: pd.DataFrame, col: str, labels: dict, order: list = None, normalize=False
+) -> pd.Series:
+    # Same as `df[col].map(labels).value_counts()`, but the labels are applied
+    # to the few counted values instead of to every row
+    counts = value_counts(df, col)
+    counts = counts[counts.index.isin(list(labels))]
+    counts = counts.groupby(counts.index.map(labels)).sum()
+    if order is not None:
+        counts = counts.reindex(order, fill_value=0)
+    else:
+        counts = counts.sort_values(ascending=False, kind="stable")
+    if normalize:
+        counts = counts / counts.sum()
+    return counts
+
+
+@prepared
+def prevalence(df: pd.DataFrame, columns: list, rows=None) -> pd.DataFrame:
+    # Yes / No / missing counts of boolean columns, one row per column.
+    # `rows` optionally narrows `df` further (a boolean mask)
+    found = cohort(df) if rows is None else None
+    counted = cube(df) if rows is None else None
+    in_cube = counted is not None and all(col in counted.metrics for col in columns)
+    packed = found is not None and all(col in found.flags for col in columns)
+    # Age prefix rows are constant-time; otherwise the packed flags cost a
+    # fixed n/8 bytes per column
+    if packed and not in_cube:
+        counts = found.flags.counts(columns, found.bits)
+    elif in_cube:
+        counts = []
+        for col in columns:
+            cells = counted.cells(col, found.key)
+            answers = dict(zip(counted.values[col], cells[:-1]))
+            counts.append([answers.get(True, 0), answers.get(False, 0), cells[-1]])
+        counts = np.array(counts, dtype=np.int64).reshape(-1, 3)
+    else:
+        # One bool block (a row per column) instead of a value_counts per
+        # column; missing answers are False in `yes`, so the two are disjoint
+        yes = np.stack([df[c].to_numpy(dtype=bool, na_value=False) for c in columns])
+        missing = np.stack([df[c].isna().to_numpy() for c in columns])
+        if rows is not None:
+            yes &= rows
+            missing &= rows
+        total = len(df) if rows is None else np.count_nonzero(rows)
+        # count_nonzero over a whole row is much faster than with `axis`
+        true = np.array([np.count_nonzero(row) for row in yes], dtype=np.int64)
+        nan = np.array([np.count_nonzero(row) for row in missing], dtype=np.int64)
+        counts = np.stack([true, total - true - nan, nan], axis=1)
+    return pd.DataFrame(counts, index=pd.Index(columns), columns=["yes", "no", "nan"])
+
+
+@prepared
+def symptoms(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    # Multi-column prevalence without a long intermediate frame: per column
+    # the respondents reporting it, their share of those who answered, and
+    # its share of all positive mentions across `columns`
+    counts = prevalence(df, columns)
+    answered = (counts["yes"] + counts["no"]).clip(lower=1)
+    return pd.DataFrame(
+        {
+            "count": counts["yes"],
+            "respondents": counts["yes"] / answered,
+            "mentions": counts["yes"] / max(counts["yes"].sum(), 1),
+        }
+    )
+
+
+@prepared
+def yes_no(
+    df: pd.DataFrame, labels: dict, var_name: str = "Response", rows=None
+) -> pd.DataFrame:
+    # Long Label / Yes-No / Percent frame for the stacked bar charts, shares
+    # taken over respondents who answered
+    counts = prevalence(df, list(labels), rows)
+    answered = (counts["yes"] + counts["no"]).clip(lower=1)
+    shares = pd.DataFrame(
+        {
+            "Label": list(labels.values()),
+            "Yes": (counts["yes"] / answered * 100).round(1).to_numpy(),
+            "No": (counts["no"] / answered * 100).round(1).to_numpy(),
+        }
+    )
+    plot_df = shares.melt(id_vars="Label", var_name=var_name, value_name="Percent")
+    plot_df["Label"] = pd.Categorical(
+        plot_df["Label"], categories=list(labels.values()), ordered=True
+    )
+    return plot_df
@@ -0,0 +1,175 @@
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+# --- Shared Cache Backends ---
+# Chart data and filter selections computed by one replica, readable by the
+# others. Entries are keyed by namespace, dataset version and canonical key,
+# expire after `ttl` seconds and are dropped oldest first past `max_mb`.
+# Values are pickled: the store must only be writable by the dashboard.
+# Set with DASHBOARD_CACHE, e.g. `redis://cache:6379/0?ttl=3600` for
+# replicas on several hosts, or `sqlite:////var/cache/dashboard.db?ttl=3600`
+# for processes of a single host; unset, every replica keeps its own.
+ENV_VAR = "DASHBOARD_CACHE"
+# File systems SQLite's locking and WAL shared memory don't work over
+NETWORK_FS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "fuse.sshfs", "glusterfs"}
+
+
+def _digest(namespace: str, key, version) -> str:
+    # Keys are tuples of strings and numbers, whose repr is the same in
+    # every process
+    return hashlib.sha1(repr((namespace, version, key)).encode()).hexdigest()
+
+
+class SQLiteBackend:
+    # One file on a local disk, shared by the processes of a single host.
+    # WAL lets readers proceed while another process writes, through an
+    # index in shared memory: it can't be shared across hosts, so a file on
+    # a network volume is not safe. Replicas on several hosts use Redis
+    def __init__(self, path: str, ttl: float = 3600, max_mb: float = 256):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_mb * 2**20
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, "
+                "value BLOB, nbytes INTEGER, expires REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS by_expiry ON entries (expires)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections stay on the thread that opened them
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5)
+            self._local.db = db
+        return db
+
+    def get(self, namespace: str, key, version):
+        row = self._connect().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires > ?",
+            (_digest(namespace, key, version), time.time()),
+        ).fetchone()
+        return None if row is None else pickle.loads(row[0])
+
+    def put(self, namespace: str, key, version, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (_digest(namespace, key, version), blob, len(blob), now + self.ttl),
+            )
+            db.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+            # Entries expiring first are the oldest
+            total = db.execute("SELECT SUM(nbytes) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                db.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM ("
+                    "SELECT key, SUM(nbytes) OVER (ORDER BY expires DESC) AS kept "
+                    "FROM entries) WHERE kept > ?)",
+                    (self.max_bytes,),
+                )
+
+
+class RedisBackend:
+    # Any client speaking the Redis protocol: `get(name)` and
+    # `set(name, value, ex=seconds)`. Expiry is per entry; size is bounded
+    # by the server's own `maxmemory` eviction policy
+    def __init__(self, client, ttl: float = 3600, prefix: str = "dashboard:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, namespace: str, key, version):
+        blob = self.client.get(self.prefix + _digest(namespace, key, version))
+        return None if blob is None else pickle.loads(blob)
+
+    def put(self, namespace: str, key, version, value):
+        self.client.set(
+            self.prefix + _digest(namespace, key, version),
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            ex=max(int(self.ttl), 1),
+        )
+
+
+class Shared:
+    # What the in-process caches talk to: a backend whose failures are
+    # logged and treated as misses, so a cache outage never breaks a chart
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, namespace: str, key, version):
+        try:
+            value = self.backend.get(namespace, key, version)
+        except Exception:
+            self.errors += 1
+            logger.warning("Shared cache read failed", exc_info=True)
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, namespace: str, key, version, value):
+        try:
+            self.backend.put(namespace, key, version, value)
+        except Exception:
+            self.errors += 1
+            logger.warning("Shared cache write failed", exc_info=True)
+
+
+def _network_fs(path: str) -> bool:
+    # Whether `path` is on a network mount, per /proc/mounts (Linux only):
+    # the longest mount point it is under decides
+    path = os.path.realpath(path).rstrip("/") + "/"
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    under = [(p, fs) for p, fs in mounts if path.startswith(p.rstrip("/") + "/")]
+    return bool(under) and max(under, key=lambda m: len(m[0]))[1] in NETWORK_FS
+
+
+def connect(url: str = None):
+    # None when no shared cache is configured
+    url = os.environ.get(ENV_VAR) if url is None else url
+    if not url:
+        return None
+    parsed = urlparse(url)
+    params = {name: float(value[-1]) for name, value in parse_qs(parsed.query).items()}
+    ttl = params.get("ttl", 3600)
+    if parsed.scheme == "sqlite":
+        # sqlite:///relative.db or sqlite:////absolute/path.db, for a single
+        # host; replicas on several hosts share a redis:// cache instead
+        path = parsed.path[1:]
+        if _network_fs(os.path.dirname(os.path.abspath(path))):
+            logger.warning(
+                "%s is on a network file system, where SQLite is not safe; "
+                "share a redis:// cache between hosts instead",
+                path,
+            )
+        return Shared(SQLiteBackend(path, ttl=ttl, max_mb=params.get("max_mb", 256)))
+    if parsed.scheme in ("redis", "rediss"):
+        # Only needed for this backend
+        import redis
+
+        client = redis.Redis.from_url(url.split("?")[0])
+        return Shared(RedisBackend(client, ttl=ttl))
+    raise ValueError(f"Unknown {ENV_VAR} scheme: {parsed.scheme!r}")
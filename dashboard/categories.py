@@ -0,0 +1,166 @@
+from . import (
+    clinical,
+    dataset,
+    demographic,
+    financial,
+    mental,
+    nutritional,
+    physical,
+    sleep,
+)
+
+# --- Dashboard Categories ---
+# Demographic Columns
+demo_columns = [
+    "age",
+    "education_level",
+    "work_model",
+    "marital_status",
+    "biological_sex",
+    "health_insurance",
+    "self_eval_health_quality",
+    "self_eval_health_general",
+    "age_binned",
+    "education_label",
+]
+
+# Physical Health Columns
+physical_columns = [
+    "height",
+    "weight",
+    "bmi",
+    "bmi_category",
+    "healthy_weight",
+    "obesity",
+    "physical_activities",
+    "active",
+    "sedentary",
+    "headache",
+    "headache_weekly",
+    "migraine",
+    "back_pain_weekly",
+    "body_pain_weekly",
+    "sit_down_time_daily",
+    "excessive_sit_down_time",
+    "bmi_label",
+    "activity_level",
+    "sitting_time",
+]
+
+# Sleep Health Columns
+sleep_columns = [
+    "self_eval_sleep_quality",
+    "sleep_hours",
+    "apnea",
+    "sleepness_day_time",
+    "wake_up_tired",
+    "sleep_break",
+    "snore",
+    "insomnia",
+]
+
+# Mental Health Columns
+mental_columns = [
+    "self_eval_mental_well_being",
+    "burnout",
+    "forgetfulness",
+    "work_satisfaction",
+    "suicide_risk",
+    "anxiety",
+    "depression",
+    "is_isolated",
+    "is_socially_active",
+    "isolation",
+    "low_quality_of_life",
+    "meaningful_life",
+    "meaningless_life",
+    "socialization",
+    "spirituality",
+    "household_situation_alone",
+    "household_situation_adults",
+    "household_situation_parents",
+    "household_situation_partner",
+    "household_situation_pet",
+]
+
+# Nutritional Health Columns
+nutritional_columns = [
+    "self_eval_nutrition",
+    "self_eval_nutrition_well_being",
+    "fast_food",
+    "fibers",
+    "fruits",
+    "processed",
+    "soft_drink",
+    "vegetables",
+    "water_intake",
+    "eat_fibers",
+    "eat_fruits",
+    "eat_vegetables",
+    "good_water_intake",
+    "high_fast_food_intake",
+    "high_processed_intake",
+    "high_sodium_intake",
+    "high_soft_drink_intake",
+    "high_cholesterol",
+]
+
+# Financial Health Columns
+financial_columns = [
+    "self_eval_finance_well_being",
+    "debt",
+    "emergency_reserve",
+    "emergency_reserve_savings_period",
+    "investments",
+    "savings_money",
+    "unexpected_expenses",
+]
+
+# Clinical Columns
+clinical_columns = [
+    "age",
+    "years_lost",
+    "heart_age",
+    "bowel_movements",
+    "constipation",
+    "smoker",
+    "quit_smoking",
+    "use_medication",
+    "polypharmacy",
+    "medication_antidepressants",
+    "medication_antipsychotics",
+    "medication_anxiolytic",
+    "medication_for_sleep",
+    "medication_for_weight_loss",
+    "appointments_dentist",
+    "appointments_generalist",
+    "appointments_nutritionist",
+    "appointments_psychologist",
+    "clean_family_history",
+    "clean_medical_history",
+    "high_cvd_risk",
+    "high_cholesterol",
+    "diabetes",
+    "diabetes_lack_exams",
+    "lack_exams_general",
+    "cancer_lack_exams",
+    "cardio_lack_exams",
+    "smoking_status",
+    "quit_status",
+]
+
+# Columns are only read from storage when a category is rendered
+CATEGORIES = [
+    {"name": "Demographic", "fn": demographic.show, "columns": demo_columns},
+    {"name": "Clinical Health", "fn": clinical.show, "columns": clinical_columns},
+    {"name": "Physical Health", "fn": physical.show, "columns": physical_columns},
+    {"name": "Sleep Health", "fn": sleep.show, "columns": sleep_columns},
+    {"name": "Mental Health", "fn": mental.show, "columns": mental_columns},
+    {
+        "name": "Nutritional Health",
+        "fn": nutritional.show,
+        "columns": nutritional_columns,
+    },
+    {"name": "Financial Health", "fn": financial.show, "columns": financial_columns},
+    {"name": "Dataset", "fn": dataset.show, "columns": None},
+]
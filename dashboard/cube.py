@@ -0,0 +1,173 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from .index import NOT_ANSWERED, RANGE_COLUMN
+
+# Filters the cube is grouped by. A key narrowing any other filter (e.g.
+# education) is counted from the tab's selected rows instead, see
+# aggregate.py
+SPLIT_COLUMN = "biological_sex"
+DIMENSIONS = [SPLIT_COLUMN, RANGE_COLUMN]
+
+
+# What a tab's rows were filtered to: app.py attaches it to each tab's view,
+# along with the packed flag store, the packed selection over the full
+# dataset and the dataset version it was all built from
+Cohort = namedtuple("Cohort", ["cube", "key", "count", "flags", "bits", "version"])
+
+
+# Respondent counts per (biological sex, age) for every discrete metric
+# column. A filtered distribution sums the cells of the matching groups, so
+# its cost depends on the number of distinct ages, not on the number of
+# respondents. Grouping by every sidebar filter would leave close to one
+# group per respondent.
+class CountCube:
+    def __init__(self, df: pd.DataFrame):
+        dims = [col for col in DIMENSIONS if col in df.columns]
+        ids = df.groupby(dims, observed=True, dropna=False, sort=False).ngroup()
+        ids = ids.to_numpy()
+        _, first = np.unique(ids, return_index=True)
+        self.groups = df[dims].iloc[first].reset_index(drop=True)
+
+        self.counts = {}
+        self.values = {}
+        self.categorical = {}
+        self.sums = {}
+        for col in df.columns:
+            if pd.api.types.is_float_dtype(df[col]):
+                # The groups already hold each age; other continuous columns
+                # keep (answers, sum, sum of squares)
+                if col in dims:
+                    continue
+                x = df[col].to_numpy(dtype="float64", na_value=np.nan)
+                answered = ~np.isnan(x)
+                x = np.where(answered, x, 0.0)
+                self.sums[col] = np.stack(
+                    [
+                        np.bincount(ids, answered, minlength=len(first)),
+                        np.bincount(ids, x, minlength=len(first)),
+                        np.bincount(ids, x * x, minlength=len(first)),
+                    ],
+                    axis=1,
+                )
+                continue
+            codes, values = pd.factorize(df[col], sort=True)
+            # Missing answers go to one extra trailing slot
+            codes = np.where(codes < 0, len(values), codes)
+            width = len(values) + 1
+            cells = np.bincount(ids * width + codes, minlength=len(first) * width)
+            self.counts[col] = cells.reshape(len(first), width).astype(np.int32)
+            self.values[col] = pd.Index(values, name=col)
+            self.categorical[col] = isinstance(df[col].dtype, pd.CategoricalDtype)
+
+        self.prefix = AgePrefix(self.groups)
+
+    @property
+    def metrics(self):
+        return self.counts.keys()
+
+    def covers(self, key: tuple) -> bool:
+        # Whether the key narrows only the filters the cube is grouped by
+        return self.prefix.covers(key)
+
+    def cells(self, col: str, key: tuple) -> np.ndarray:
+        # Counts per value for the cohort, missing answers last
+        return self.prefix.total(self.counts, col, key)
+
+    def stats(self, col: str, key: tuple) -> tuple:
+        # (answers, mean, variance) of a continuous column for the cohort
+        n, total, squares = self.prefix.total(self.sums, col, key)
+        if n == 0:
+            return 0, np.nan, np.nan
+        mean = total / n
+        return int(n), mean, max(squares / n - mean * mean, 0.0)
+
+    def mean_by_age(self, col: str, key: tuple) -> pd.Series:
+        ages, sums = self.prefix.by_age(self.sums, col, key)
+        # Like a groupby, ages nobody in the cohort answered are left out
+        answered = (sums[:, 0] > 0) & ~np.isnan(ages)
+        return pd.Series(
+            sums[answered, 1] / sums[answered, 0],
+            index=pd.Index(ages[answered], name=RANGE_COLUMN),
+            name=col,
+        )
+
+    def value_counts(self, col: str, key: tuple, normalize: bool = False):
+        counts = pd.Series(
+            self.cells(col, key)[:-1],
+            index=self.values[col],
+            name="proportion" if normalize else "count",
+        )
+        # Like pandas, only categoricals list values nobody picked
+        if not self.categorical[col]:
+            counts = counts[counts > 0]
+        counts = counts.sort_values(ascending=False, kind="stable")
+        if normalize:
+            counts = counts / counts.sum()
+        return counts
+
+
+# Running totals of the cube along the sorted age axis, one table per
+# biological sex. The counts of an age range are the difference of two
+# prefix rows, so moving the age slider costs the same at any data size.
+class AgePrefix:
+    def __init__(self, groups: pd.DataFrame):
+        ages = groups[RANGE_COLUMN].to_numpy(dtype="float64", na_value=np.nan)
+        # NaN sorts last: only the full, unnarrowed age axis reaches it
+        self.ages, self.age_codes = np.unique(ages, return_inverse=True)
+        if SPLIT_COLUMN in groups.columns:
+            codes, sexes = pd.factorize(groups[SPLIT_COLUMN], sort=True)
+        else:
+            codes, sexes = np.zeros(len(groups), dtype=int), []
+        self.sexes = list(sexes)
+        # Respondents without an answer get one extra table, selected by the
+        # NOT_ANSWERED option
+        self.sex_codes = np.where(codes < 0, len(self.sexes), codes)
+        self._tables = {}
+
+    def covers(self, key: tuple) -> bool:
+        return all(col in (RANGE_COLUMN, SPLIT_COLUMN) for col, _ in key)
+
+    def table(self, groups: dict, col: str) -> np.ndarray:
+        # Built on first use: (sexes + 1) x (ages + 1) x values, row 0 empty.
+        # Count and sum columns never overlap, so the name alone is the key
+        found = self._tables.get(col)
+        if found is None:
+            cells = groups[col]
+            shape = (len(self.sexes) + 1, len(self.ages), cells.shape[1])
+            found = np.zeros(shape, dtype=cells.dtype)
+            np.add.at(found, (self.sex_codes, self.age_codes), cells)
+            found = np.concatenate(
+                [np.zeros_like(found[:, :1]), found.cumsum(axis=1)], axis=1
+            )
+            self._tables[col] = found
+        return found
+
+    def _bounds(self, key: tuple):
+        narrowed = dict(key)
+        if SPLIT_COLUMN in narrowed:
+            chosen = narrowed[SPLIT_COLUMN]
+            sexes = [code for code, sex in enumerate(self.sexes) if sex in chosen]
+            if NOT_ANSWERED in chosen:
+                sexes.append(len(self.sexes))
+        else:
+            sexes = slice(None)
+        if RANGE_COLUMN in narrowed:
+            lo, hi = narrowed[RANGE_COLUMN]
+            start = np.searchsorted(self.ages, lo, side="left")
+            stop = np.searchsorted(self.ages, hi, side="right")
+        else:
+            start, stop = 0, len(self.ages)
+        return sexes, start, stop
+
+    def total(self, groups: dict, col: str, key: tuple) -> np.ndarray:
+        sexes, start, stop = self._bounds(key)
+        table = self.table(groups, col)[sexes]
+        return (table[:, stop] - table[:, start]).sum(axis=0)
+
+    def by_age(self, groups: dict, col: str, key: tuple):
+        # Per-age totals are the differences of consecutive prefix rows
+        sexes, start, stop = self._bounds(key)
+        table = self.table(groups, col)[sexes]
+        per_age = np.diff(table[:, start : stop + 1], axis=1).sum(axis=0)
+        return self.ages[start:stop], per_age
@@ -6,12 +6,13 @@ def shape(df: pd.DataFrame):
     st.markdown(f"**Dataset Shape:** `{df.shape[0]}` rows x `{df.shape[1]}` columns")
 
 
+# A fragment: moving the slider reruns only this preview, not the dashboard
+@st.fragment
 def sample(df: pd.DataFrame, key: str):
     n = st.slider(
         "Select number of rows to sample",
         min_value=1,
         max_value=10,
-        value=1,
         key=key,
     )
     st.dataframe(df.sample(n), use_container_width=True)
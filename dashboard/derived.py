@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from . import schema
+
+# --- Chart Labels and Bins ---
+# Computed once when a column is loaded, as ordered categoricals, so chart
+# functions read them instead of writing labels into the frame on every rerun.
+# `labels` maps source values to labels and lists the labels in chart order;
+# source values it doesn't name follow them.
+DERIVED = [
+    {
+        "column": "smoking_status",
+        "source": "smoker",
+        "labels": {True: "Smoker", False: "Non-smoker"},
+    },
+    {
+        "column": "quit_status",
+        "source": "quit_smoking",
+        "labels": {True: "Wants to Quit", False: "Doesn't Want to Quit"},
+    },
+    {
+        "column": "age_binned",
+        "source": "age",
+        "bins": [18, 25, 35, 45, 55, 65, 100],
+        "labels": ["18-24", "25-34", "35-44", "45-54", "55-64", "65+"],
+    },
+    {
+        "column": "education_label",
+        "source": "education_level",
+        "labels": {
+            "incomplete_elementary": "Elem. Incomplete",
+            "complete_elementary": "Elem. Completed",
+            "incomplete_high_school": "HS Incomplete",
+            "complete_high_school": "HS Completed",
+            "incomplete_higher_education": "Univ. Incomplete",
+            "complete_higher_education": "Univ. Completed",
+            "masters": "Masters",
+            "post_graduation": "Postgrad",
+            "ph_d": "PhD",
+        },
+    },
+    {
+        # "Peso Elevado" is the same class as "Obesidade grau 1"
+        "column": "bmi_label",
+        "source": "bmi_category",
+        "labels": {
+            "Abaixo do peso.": "Abaixo do peso.",
+            "Peso normal": "Peso normal",
+            "Peso Elevado": "Obesidade grau 1",
+            "Obesidade grau 1": "Obesidade grau 1",
+            "Obesidade grau 2": "Obesidade grau 2",
+            "Obesidade grau 3": "Obesidade grau 3",
+        },
+    },
+    {
+        "column": "activity_level",
+        "source": "physical_activities",
+        "labels": schema.ACTIVITY,
+    },
+    {
+        "column": "sitting_time",
+        "source": "sit_down_time_daily",
+        "labels": schema.SITTING_TIME,
+    },
+]
+
+COLUMNS = {spec["column"]: spec for spec in DERIVED}
+
+
+def order(col: str) -> list:
+    labels = COLUMNS[col]["labels"]
+    if isinstance(labels, dict):
+        labels = labels.values()
+    return list(dict.fromkeys(labels))
+
+
+def compute(col: str, source: pd.Series) -> pd.Series:
+    spec = COLUMNS[col]
+    if "bins" in spec:
+        values = pd.cut(source, bins=spec["bins"], labels=spec["labels"], right=False)
+        return values.rename(col)
+
+    # Map the few source categories to label codes, then take the codes per
+    # row. Values without a label are kept as they are, after the declared
+    # labels, as schema.ordered keeps answers outside a scale
+    source = source.astype("category")
+    named = [spec["labels"].get(value, value) for value in source.cat.categories]
+    labels = list(dict.fromkeys([*order(col), *named]))
+    target = pd.Index(labels).get_indexer(named)
+    # A trailing -1 keeps missing source values (code -1) missing
+    codes = np.append(target, -1)[source.cat.codes.to_numpy()]
+    values = pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+    return pd.Series(values, index=source.index, name=col)
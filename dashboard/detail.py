@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# --- Level of Detail ---
+# Point-level charts send every respondent as SVG points up to POINTS rows
+# (where plotly express itself would switch), the same points drawn with
+# WebGL up to WEBGL rows, and a server-side summary above that
+POINTS = 1_000
+WEBGL = 20_000
+
+
+def level(rows: int) -> str:
+    if rows <= POINTS:
+        return "points"
+    if rows <= WEBGL:
+        return "webgl"
+    return "summary"
+
+
+def bins(x: np.ndarray, y: np.ndarray, codes: np.ndarray, labels, size=64):
+    # Respondents per cell of a size x size grid over the x/y range, with
+    # the label most of them have. `codes` index `labels`, -1 is missing
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y, codes = x[valid], y[valid], codes[valid]
+    if not len(x):
+        return pd.DataFrame(columns=["x", "y", "count", "label"])
+    edges = [np.linspace(v.min(), v.max(), size + 1) for v in (x, y)]
+    cols, rows = [
+        np.clip(((v - e[0]) / (e[1] - e[0] or 1)).astype(int), 0, size - 1)
+        for v, e in zip((x, y), edges)
+    ]
+    cell = rows * size + cols
+    # One extra slot per cell for respondents without a label
+    width = len(labels) + 1
+    codes = np.where(codes < 0, len(labels), codes)
+    counts = np.bincount(cell * width + codes, minlength=size * size * width)
+    counts = counts.reshape(size * size, width)
+    total = counts.sum(axis=1)
+    used = np.flatnonzero(total)
+    labelled = counts[used, :-1]
+    dominant = np.where(labelled.any(axis=1), labelled.argmax(axis=1), -1)
+    centres = [(e[:-1] + e[1:]) / 2 for e in edges]
+    return pd.DataFrame(
+        {
+            "x": centres[0][used % size],
+            "y": centres[1][used // size],
+            "count": total[used],
+            "label": pd.Categorical.from_codes(dominant, categories=labels),
+        }
+    )
+
+
+def density(values: np.ndarray, size: int = 512) -> pd.DataFrame:
+    # Gaussian KDE on a grid, Silverman's bandwidth as in plotly's violin.
+    # Values are first counted into grid cells, so the cost is one pass over
+    # the values plus a convolution over the grid
+    values = values[~np.isnan(values)]
+    if len(values) < 2:
+        return pd.DataFrame(columns=["value", "density"])
+    q1, q3 = np.percentile(values, [25, 75])
+    spread = min(values.std(), (q3 - q1) / 1.349)
+    bandwidth = 1.059 * (spread or values.std() or 1.0) * len(values) ** -0.2
+    low, high = values.min() - 2 * bandwidth, values.max() + 2 * bandwidth
+    grid = np.linspace(low, high, size)
+    step = grid[1] - grid[0]
+    # Counting into cells already smooths by one cell width
+    bandwidth = max(bandwidth, step)
+    cells = np.clip(np.rint((values - grid[0]) / step).astype(int), 0, size - 1)
+    counts = np.bincount(cells, minlength=size)
+    reach = min(int(np.ceil(4 * bandwidth / step)), size)
+    offsets = np.arange(-reach, reach + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    smooth = np.convolve(counts, kernel)[reach : reach + size]
+    smooth = smooth / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    return pd.DataFrame({"value": grid, "density": smooth})
+
+
+def quantiles(values: np.ndarray) -> pd.Series:
+    # The box of a plotly box/violin trace: quartiles, 1.5 IQR fences
+    # clipped to the data, and the mean
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return pd.Series(dtype="float64")
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    return pd.Series(
+        {
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "lowerfence": values[values >= low].min(),
+            "upperfence": values[values <= high].max(),
+            "mean": values.mean(),
+            "count": len(values),
+        }
+    )
@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from . import graph
+
+# Figures per chart, one per set of labels the chart has been drawn with
+MAX_SHAPES = 8
+
+_figures = OrderedDict()
+# Inputs of the chart (see graph.py) each figure was last drawn with
+_drawn = {}
+_locks = {}
+_lock = threading.Lock()
+
+
+def _shape(data: pd.DataFrame, columns: dict) -> tuple:
+    # Everything but the patched columns: labels, groups, colours. Traces,
+    # axes and legends only depend on these, so equal shapes share a figure
+    return tuple(
+        (col, tuple(data[col])) for col in data.columns if col not in columns.values()
+    )
+
+
+def _patch(figure: go.Figure, data: pd.DataFrame, columns: dict, group: str):
+    with figure.batch_update():
+        for trace in figure.data:
+            rows = data
+            if group is not None:
+                rows = data[data[group].astype(str) == trace.name]
+            trace.update({attr: rows[col].to_numpy() for attr, col in columns.items()})
+
+
+def plot(
+    data: pd.DataFrame, build, group: str = None, layout=None, chart=None, **columns
+):
+    # Draws `build(data)` the first time, then only writes the `columns` of
+    # new data into the trace arrays (trace attribute=column). `group` is
+    # the column plotly express splits traces by; `layout(data)` returns the
+    # layout values that follow the data. A chart that draws a figure with
+    # the same inputs it was last drawn with sends it unchanged
+    if chart is None:
+        chart = f"{build.__module__}.{build.__qualname__}"
+    key = (chart, _shape(data, columns))
+    inputs = graph.current()
+    with _lock:
+        lock = _locks.setdefault(chart, threading.Lock())
+    # The figure is patched and serialized by one session at a time
+    with lock:
+        with _lock:
+            figure = _figures.get(key)
+            if figure is not None:
+                _figures.move_to_end(key)
+        changed = inputs is None or _drawn.get(key) != inputs
+        if figure is None:
+            figure = build(data)
+            with _lock:
+                _figures[key] = figure
+                shapes = [k for k in _figures if k[0] == chart]
+                for old in shapes[:-MAX_SHAPES]:
+                    del _figures[old]
+                    _drawn.pop(old, None)
+        elif changed:
+            _patch(figure, data, columns, group)
+        if changed and layout is not None:
+            figure.update_layout(layout(data))
+        _drawn[key] = inputs
+        st.plotly_chart(figure, use_container_width=True)
+
+
+def lollipop(counts: pd.DataFrame, title: str):
+    # Score / Percentage / Color frame over a -5..5 scale. Stems are one bar
+    # trace rather than a shape per score
+    def build(counts):
+        fig = go.Figure()
+        fig.add_trace(
+            go.Bar(
+                x=counts["Score"],
+                y=counts["Percentage"],
+                width=0.06,
+                marker=dict(color=counts["Color"], line=dict(width=0)),
+                hoverinfo="skip",
+                showlegend=False,
+            )
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=counts["Score"],
+                y=counts["Percentage"],
+                mode="markers",
+                marker=dict(
+                    size=12, color=counts["Color"], line=dict(width=1, color="black")
+                ),
+                hovertemplate="Score: %{x}<br>%{y:.1f}%",
+                showlegend=False,
+            )
+        )
+        fig.update_layout(
+            title=title,
+            xaxis=dict(dtick=1, title="Score", tickmode="linear"),
+            yaxis=dict(title="Percentage of People"),
+            template="plotly_white",
+            height=400,
+            margin=dict(t=50, b=40, l=30, r=30),
+        )
+        return fig
+
+    plot(
+        counts,
+        build,
+        chart=("lollipop", title),
+        layout=lambda counts: dict(yaxis_range=[0, counts["Percentage"].max() + 5]),
+        y="Percentage",
+    )
@@ -1,44 +1,145 @@
+import threading
+from collections import OrderedDict, namedtuple
 import streamlit as st
-import pandas as pd
+import numpy as np
+from .index import FilterIndex, RANGE_COLUMN
 
+# --- Sidebar Filters ---
+# Multiselects default to every value, the slider to the full range
+FILTERS = [
+    {
+        "column": "biological_sex",
+        "label": "Biological Sex",
+        "widget": "multiselect",
+        "key": "selected_sexes",
+    },
+    {
+        "column": RANGE_COLUMN,
+        "label": "Age Range",
+        "widget": "slider",
+        "key": "age_range",
+    },
+    {
+        "column": "education_level",
+        "label": "Education Level",
+        "widget": "multiselect",
+        "key": "selected_edu",
+    },
+    {
+        "column": "work_model",
+        "label": "Work Model",
+        "widget": "multiselect",
+        "key": "selected_work_model",
+    },
+    {
+        "column": "health_insurance",
+        "label": "Health Insurance",
+        "widget": "multiselect",
+        "key": "selected_insurance",
+    },
+    {
+        "column": "marital_status",
+        "label": "Marital Status",
+        "widget": "multiselect",
+        "key": "selected_marital_status",
+    },
+]
 
-def show(df: pd.DataFrame):
-    st.sidebar.header("🔍 Filter Participants")
+# `key` is the canonical filter state: only filters narrowed from their
+# default appear in it, so equivalent selections share one cache entry.
+# `bits` is `mask` packed 8 rows to a byte
+Selection = namedtuple("Selection", ["key", "mask", "count", "bits"])
+
+
+# Selections are kept per canonical key, and also in a shared `backend`
+# (see backends.py) under the dataset `version` when one is given
+class FilterEngine:
+    def __init__(
+        self, index: FilterIndex, maxsize: int = 256, version=None, backend=None
+    ):
+        self.index = index
+        self.maxsize = maxsize
+        self.version = version
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def options(self, spec: dict):
+        if spec["widget"] == "slider":
+            return tuple(int(age) for age in self.index.age_bounds())
+        return self.index.values(spec["column"])
 
-    # --- Set Default Filter Values ---
-    age_min, age_max = int(df["age"].min()), int(df["age"].max())
-    sexes = df["biological_sex"].dropna().unique().tolist()
+    def canonical(self, state: dict) -> tuple:
+        key = []
+        for spec in FILTERS:
+            value = state.get(spec["column"])
+            options = self.options(spec)
+            if spec["widget"] == "slider":
+                if value is not None and tuple(value) != options:
+                    key.append((spec["column"], tuple(value)))
+            elif value is not None and not set(options) <= set(value):
+                key.append((spec["column"], tuple(sorted(value))))
+        return tuple(key)
 
-    selected_sexes = st.sidebar.multiselect(
-        "Biological Sex",
-        options=sexes,
-        default=st.session_state.get("selected_sexes", sexes),
-        key="selected_sexes",
-    )
+    def select(self, state: dict) -> Selection:
+        key = self.canonical(state)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        if cached is None and self.backend is not None:
+            cached = self.backend.get("selection", key, self.version)
+        if cached is None:
+            narrowed = dict(key)
+            bits = self.index.select_bits(narrowed.pop(RANGE_COLUMN, None), **narrowed)
+            cached = (bits, int(np.unpackbits(bits).sum()))
+            if self.backend is not None:
+                self.backend.put("selection", key, self.version, cached)
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = cached
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        bits, count = cached
+        return Selection(key, self.index.unpack(bits), count, bits)
+
+
+def show(engine: FilterEngine) -> Selection:
+    st.sidebar.header("🔍 Filter Participants")
 
     # --- Filters Stored in Session ---
-    age_range = st.sidebar.slider(
-        "Age Range",
-        min_value=age_min,
-        max_value=age_max,
-        value=st.session_state.get("age_range", (age_min, age_max)),
-        key="age_range",
-    )
+    state = {}
+    for spec in FILTERS:
+        options = engine.options(spec)
+        if spec["widget"] == "slider":
+            state[spec["column"]] = st.sidebar.slider(
+                spec["label"],
+                min_value=options[0],
+                max_value=options[1],
+                value=st.session_state.get(spec["key"], options),
+                key=spec["key"],
+            )
+        else:
+            state[spec["column"]] = st.sidebar.multiselect(
+                spec["label"],
+                options=options,
+                default=st.session_state.get(spec["key"], options),
+                key=spec["key"],
+            )
 
     # --- Reset Button ---
     if st.sidebar.button("🔄 Reset Filters"):
-        for key in ["age_range", "selected_sexes", "selected_edu"]:
-            if key in st.session_state:
-                del st.session_state[key]
+        for spec in FILTERS:
+            if spec["key"] in st.session_state:
+                del st.session_state[spec["key"]]
         st.rerun()
 
     # --- Apply Filters ---
-    filtered_df = df[
-        (df["age"] >= age_range[0])
-        & (df["age"] <= age_range[1])
-        & (df["biological_sex"].isin(selected_sexes))
-    ]
+    selection = engine.select(state)
 
-    st.sidebar.markdown(f"**Participants: {len(filtered_df)} shown**")
+    st.sidebar.markdown(f"**Participants: {selection.count} shown**")
 
-    return filtered_df
+    return selection
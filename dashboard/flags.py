@@ -0,0 +1,95 @@
+import threading
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# Set bits per byte value, for numpy versions without np.bitwise_count
+_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+def popcount(bits: np.ndarray, axis=None):
+    if hasattr(np, "bitwise_count"):
+        ones = np.bitwise_count(bits)
+    else:
+        ones = _POPCOUNT[bits]
+    return ones.sum(axis=axis, dtype=np.int64)
+
+
+# A boolean column packed 8 rows to a byte: the Yes answers, and the rows
+# that answered at all. This is how the datasets hold flag columns; frames
+# asking for one get it unpacked, and nothing keeps the unpacked copy
+Packed = namedtuple("Packed", ["bits", "valid", "size"])
+
+
+def pack(values: pd.Series) -> Packed:
+    answered = values.notna().to_numpy()
+    yes = values.to_numpy(dtype=bool, na_value=False)
+    return Packed(np.packbits(yes), np.packbits(answered), len(values))
+
+
+def unpack(packed: Packed, rows: np.ndarray = None) -> pd.arrays.BooleanArray:
+    # Every row, or only the row positions in `rows`
+    if rows is None:
+        yes = np.unpackbits(packed.bits, count=packed.size).view(bool)
+        answered = np.unpackbits(packed.valid, count=packed.size).view(bool)
+    else:
+        rows = np.asarray(rows, dtype=np.int64)
+        shift = (7 - (rows & 7)).astype(np.uint8)
+        yes = (packed.bits[rows >> 3] >> shift & 1).view(bool)
+        answered = (packed.valid[rows >> 3] >> shift & 1).view(bool)
+    return pd.arrays.BooleanArray(yes, ~answered)
+
+
+def is_flag(values: pd.Series) -> bool:
+    return isinstance(values.dtype, pd.BooleanDtype)
+
+
+# The boolean survey flags packed 8 rows to a byte: one bitmap of Yes
+# answers and one validity bitmap of rows that answered at all. Counts for
+# any row selection are popcount(selection & bits), with no pandas column
+# kept around. A dataset hands out the flags it already holds packed; plain
+# frames are packed the first time a column is asked for, so a tab that is
+# never opened never loads its flags.
+class FlagStore:
+    def __init__(self, source, columns: list):
+        self.source = source
+        self.columns = [col for col in columns if col in source.columns]
+        self.size = len(source)
+        self._packed = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, col: str) -> bool:
+        return col in self.columns
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.bits.nbytes + col.valid.nbytes for col in self._packed.values())
+
+    def packed(self, columns: list) -> tuple:
+        if hasattr(self.source, "packed"):
+            found = [self.source.packed(col) for col in columns]
+        else:
+            missing = [col for col in columns if col not in self._packed]
+            if missing:
+                df = self.source[missing]
+                with self._lock:
+                    for col in missing:
+                        self._packed[col] = pack(df[col])
+            found = [self._packed[col] for col in columns]
+        bits = np.stack([col.bits for col in found])
+        valid = np.stack([col.valid for col in found])
+        return bits, valid
+
+    def counts(self, columns: list, selection: np.ndarray = None) -> np.ndarray:
+        # Yes / No / missing per column, for the rows set in the packed
+        # `selection` (all rows when None)
+        bits, valid = self.packed(columns)
+        if selection is None:
+            total = self.size
+        else:
+            bits &= selection
+            valid &= selection
+            total = popcount(selection)
+        true = popcount(bits, axis=1)
+        answered = popcount(valid, axis=1)
+        return np.stack([true, answered - true, total - answered], axis=1)
@@ -0,0 +1,72 @@
+import functools
+import threading
+import streamlit as st
+from . import memo
+from .filters import FILTERS
+from .storage import CategoryView
+
+# --- Rerun Dependency Graph ---
+# Charts are nodes that declare what they read: dataset columns, sidebar
+# filter dimensions and chart-local widgets (by session state key). While a
+# chart runs, its inputs are the dataset version, the narrowed filters among
+# its dimensions, its widget values and its arguments. figures.plot keeps the
+# inputs each figure was last drawn with, so a chart whose inputs did not
+# change sends its figures again as they are, and one whose inputs changed
+# only patches its own figures.
+DIMENSIONS = tuple(spec["column"] for spec in FILTERS)
+
+# Every declared chart by name; its inputs are in `columns`, `filters` and
+# `widgets`
+NODES = {}
+
+_running = threading.local()
+
+
+def current():
+    # Inputs of the next figure the running chart draws, numbered in drawing
+    # order. None outside a chart or for a frame without a cohort, whose
+    # figures are always patched
+    running = getattr(_running, "node", None)
+    if running is None or running[1] is None:
+        return None
+    _running.node = (running[0], running[1], running[2] + 1)
+    return running
+
+
+def node(columns: list, filters: tuple = DIMENSIONS, widgets: list = None):
+    widgets = list(widgets or [])
+
+    def decorate(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(df, *args, **kwargs):
+            cohort = getattr(df, "cohort", None)
+            inputs = None
+            if cohort is not None:
+                try:
+                    inputs = (
+                        cohort.version,
+                        tuple(item for item in cohort.key if item[0] in filters),
+                        tuple(st.session_state.get(key) for key in widgets),
+                        memo.options(args, kwargs),
+                    )
+                except TypeError:
+                    pass
+            if isinstance(df, CategoryView):
+                # The chart only sees the columns it declared
+                df = CategoryView(df.source, columns, df.rows, cohort)
+            outer = getattr(_running, "node", None)
+            _running.node = (name, inputs, 0)
+            try:
+                return fn(df, *args, **kwargs)
+            finally:
+                _running.node = outer
+
+        wrapper.columns = list(columns)
+        wrapper.filters = tuple(filters)
+        wrapper.widgets = widgets
+        NODES[name] = wrapper
+        return wrapper
+
+    return decorate
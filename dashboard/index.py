@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+# Columns the sidebar can filter on by value
+VALUE_COLUMNS = [
+    "biological_sex",
+    "education_level",
+    "work_model",
+    "health_insurance",
+    "marital_status",
+]
+RANGE_COLUMN = "age"
+COLUMNS = [RANGE_COLUMN, *VALUE_COLUMNS]
+# Option standing for the rows of a value column with no answer
+NOT_ANSWERED = "Not answered"
+
+
+# Precomputed row sets for the sidebar filters: one packed bitmap per value
+# of each filterable column, and the age column as a sorted position index.
+# Any filter combination resolves to a row mask without scanning the frame.
+# Rows missing a value are only left out by a filter that was narrowed: an
+# age range never reaches them, and a multiselect offers them as one more
+# option, so deselecting a value removes exactly the rows that hold it.
+class FilterIndex:
+    def __init__(self, df: pd.DataFrame):
+        self.size = len(df)
+
+        ages = df[RANGE_COLUMN].to_numpy(dtype="float64", na_value=np.nan)
+        # NaN sorts last, so no age range ever reaches it
+        self.order = np.argsort(ages, kind="stable")
+        self.sorted_ages = ages[self.order]
+
+        self.bitmaps = {}
+        for col in VALUE_COLUMNS:
+            if col not in df.columns:
+                continue
+            codes, values = pd.factorize(df[col], sort=True)
+            self.bitmaps[col] = {
+                value: np.packbits(codes == code) for code, value in enumerate(values)
+            }
+            if (codes < 0).any():
+                self.bitmaps[col][NOT_ANSWERED] = np.packbits(codes < 0)
+
+    def values(self, col: str) -> list:
+        return list(self.bitmaps.get(col, {}))
+
+    def age_bounds(self) -> tuple:
+        ages = self.sorted_ages[~np.isnan(self.sorted_ages)]
+        return ages[0], ages[-1]
+
+    def _age_bits(self, lo: float, hi: float) -> np.ndarray:
+        start = np.searchsorted(self.sorted_ages, lo, side="left")
+        stop = np.searchsorted(self.sorted_ages, hi, side="right")
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.order[start:stop]] = True
+        return np.packbits(mask)
+
+    def select(self, age_range: tuple = None, **selected) -> np.ndarray:
+        return self.unpack(self.select_bits(age_range, **selected))
+
+    def unpack(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bits, count=self.size).view(bool)
+
+    def select_bits(self, age_range: tuple = None, **selected) -> np.ndarray:
+        bits = np.packbits(np.ones(self.size, dtype=bool))
+        if age_range is not None:
+            bits &= self._age_bits(*age_range)
+        for col, values in selected.items():
+            if col not in self.bitmaps:
+                continue
+            chosen = np.zeros_like(bits)
+            for value in values:
+                if value in self.bitmaps[col]:
+                    chosen |= self.bitmaps[col][value]
+            bits &= chosen
+        return bits
@@ -0,0 +1,120 @@
+import functools
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+def _hashable(value):
+    # Labels and column lists arrive as dicts and lists; anything else that
+    # cannot be hashed (e.g. a row mask) makes the call uncacheable
+    if isinstance(value, dict):
+        return tuple((k, _hashable(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    hash(value)
+    return value
+
+
+def options(args: tuple, kwargs: dict) -> tuple:
+    # Call arguments as a hashable key; TypeError when one can't be
+    return _hashable(args), _hashable(sorted(kwargs.items()))
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _shared(value):
+    # Charts rename and add columns on what they get back; with copy-on-write
+    # a shallow copy keeps those writes off the cached result
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+# Prepared chart data per (chart, arguments, canonical filter key, dataset
+# version), shared by every session of the process. The least recently used
+# results are dropped once they take more than `max_mb`, and all of them
+# when a new dataset version shows up. A `backend` (see backends.py) is
+# asked before computing and given what was computed, so other replicas
+# reuse the result.
+class PrepCache:
+    def __init__(self, max_mb: float = 64, backend=None):
+        self.max_bytes = max_mb * 2**20
+        self.backend = backend
+        self.version = None
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _invalidate(self, version):
+        if version != self.version:
+            self._cache.clear()
+            self.nbytes = 0
+            self.version = version
+
+    def get(self, key: tuple, version, compute):
+        with self._lock:
+            self._invalidate(version)
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        if cached is None:
+            value = None
+            if self.backend is not None:
+                value = self.backend.get("prep", key, version)
+            if value is None:
+                value = compute()
+                if self.backend is not None:
+                    self.backend.put("prep", key, version, value)
+            cached = (value, _nbytes(value))
+            with self._lock:
+                self.misses += 1
+                # The dataset changed while computing: don't keep a stale result
+                if version == self.version and cached[1] <= self.max_bytes:
+                    if key not in self._cache:
+                        self.nbytes += cached[1]
+                    self._cache[key] = cached
+                    while self.nbytes > self.max_bytes:
+                        self.nbytes -= self._cache.popitem(last=False)[1][1]
+        return _shared(cached[0])
+
+
+CACHE = PrepCache()
+
+
+def prepared(fn):
+    # For chart data-prep functions `fn(df, *args)` that depend only on the
+    # rows of `df`: a tab's view carries its cohort (filter key and dataset
+    # version), which stands in for the rows. Frames without one, such as
+    # chart-local subsets, are computed every time.
+    chart = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(df, *args, **kwargs):
+        cohort = getattr(df, "cohort", None)
+        if cohort is None:
+            return fn(df, *args, **kwargs)
+        try:
+            key = (chart, *options(args, kwargs), cohort.key)
+        except TypeError:
+            return fn(df, *args, **kwargs)
+        return CACHE.get(key, cohort.version, lambda: fn(df, *args, **kwargs))
+
+    return wrapper
@@ -1,84 +1,103 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 from .health_dash import template
+from .aggregate import distribution
+from .memo import prepared
+from .figures import plot
+from .graph import node
+from . import derived, detail
 import plotly.express as px
 import plotly.graph_objects as go
 
 
-def bmi(df: pd.DataFrame):
-    st.subheader("⚖️ Weight vs. Height Colored by BMI Category")
-
-    # Rename category for consistency
-    df["bmi_category"] = df["bmi_category"].replace(
-        {"Peso Elevado": "Obesidade grau 1"}
-    )
-
-    # Define desired order and color for categories
-    bmi_order = [
-        "Abaixo do peso.",
-        "Peso normal",
-        "Obesidade grau 1",
-        "Obesidade grau 2",
-        "Obesidade grau 3",
-    ]
-
-    bmi_colors = {
-        "Abaixo do peso.": "#1f77b4",  # blue
-        "Peso normal": "#59a14f",  # green
-        "Obesidade grau 1": "#e15759",  # red
-        "Obesidade grau 2": "#f28e2b",  # orange
-        "Obesidade grau 3": "#d62728",  # dark red
-    }
-
-    # Enforce order in the data
-    df["bmi_category"] = pd.Categorical(
-        df["bmi_category"], categories=bmi_order, ordered=True
-    )
-
-    fig = px.scatter(
-        df,
-        x="height",
-        y="weight",
-        color="bmi_category",
-        category_orders={"bmi_category": bmi_order},
-        size="bmi",
-        hover_data=["bmi", "bmi_category"],
-        labels={
-            "height": "Height (cm)",
-            "weight": "Weight (kg)",
-            "bmi_category": "BMI Category",
-            "bmi": "BMI",
-        },
-        title="Physical Health: Weight vs Height by BMI Category",
-        opacity=0.7,
-        color_discrete_map=bmi_colors,
+# Categories arrive relabelled and ordered in `bmi_label`
+BMI_COLORS = {
+    "Abaixo do peso.": "#1f77b4",  # blue
+    "Peso normal": "#59a14f",  # green
+    "Obesidade grau 1": "#e15759",  # red
+    "Obesidade grau 2": "#f28e2b",  # orange
+    "Obesidade grau 3": "#d62728",  # dark red
+}
+
+BMI_LABELS = {
+    "height": "Height (cm)",
+    "weight": "Weight (kg)",
+    "bmi_label": "BMI Category",
+    "bmi": "BMI",
+    "count": "Respondents",
+}
+
+
+@prepared
+def bmi_cells(df: pd.DataFrame) -> pd.DataFrame:
+    # Height/weight grid cells coloured by their most common category
+    labels = df["bmi_label"]
+    cells = detail.bins(
+        df["height"].to_numpy(dtype="float64", na_value=np.nan),
+        df["weight"].to_numpy(dtype="float64", na_value=np.nan),
+        labels.cat.codes.to_numpy(),
+        labels.cat.categories,
     )
+    return cells.rename(columns={"x": "height", "y": "weight", "label": "bmi_label"})
+
+
+def bmi_figure(df: pd.DataFrame, mode: str):
+    title = "Physical Health: Weight vs Height by BMI Category"
+    if mode == "summary":
+        fig = px.scatter(
+            bmi_cells(df),
+            x="height",
+            y="weight",
+            color="bmi_label",
+            category_orders={"bmi_label": derived.order("bmi_label")},
+            size="count",
+            hover_data=["count", "bmi_label"],
+            labels=BMI_LABELS,
+            title=title,
+            opacity=0.7,
+            color_discrete_map=BMI_COLORS,
+            render_mode="webgl",
+        )
+        fig.update_traces(marker_symbol="square")
+    else:
+        fig = px.scatter(
+            df[["height", "weight", "bmi", "bmi_label"]],
+            x="height",
+            y="weight",
+            color="bmi_label",
+            category_orders={"bmi_label": derived.order("bmi_label")},
+            size="bmi",
+            hover_data=["bmi", "bmi_label"],
+            labels=BMI_LABELS,
+            title=title,
+            opacity=0.7,
+            color_discrete_map=BMI_COLORS,
+            render_mode="svg" if mode == "points" else "webgl",
+        )
 
     fig.update_layout(legend_title_text="BMI Category")
-    st.plotly_chart(fig, use_container_width=True)
-
+    return fig
 
-def activities(df: pd.DataFrame):
-    st.subheader("🏃 Active and Sedentary Classification by Weekly Activity Duration")
 
-    # Remap to WHO hour-based labels
-    activity_label_map = {
-        "none": "0 min / week",
-        "low": "Less than 150min / week",
-        "moderate": "More than 150min / week",
-        "high": "More than 240min / week",
-    }
+@node(["height", "weight", "bmi", "bmi_label"])
+def bmi(df: pd.DataFrame):
+    st.subheader("⚖️ Weight vs. Height Colored by BMI Category")
 
-    order = ["none", "low", "moderate", "high"]
-    label_order = [activity_label_map[o] for o in order]
+    mode = detail.level(len(df))
+    if mode == "summary":
+        st.caption(
+            f"{len(df):,} respondents, shown as a height/weight grid: each "
+            "square's size is its number of respondents and its colour their "
+            "most common BMI category."
+        )
+    st.plotly_chart(bmi_figure(df, mode), use_container_width=True)
 
-    df["activity_level"] = df["physical_activities"].map(activity_label_map)
-    df["activity_level"] = pd.Categorical(
-        df["activity_level"], categories=label_order, ordered=True
-    )
 
+@prepared
+def activity_shares(df: pd.DataFrame) -> pd.DataFrame:
     # Melt active/sedentary columns
-    melted = df.melt(
+    melted = df[["activity_level", "active", "sedentary"]].melt(
         id_vars="activity_level",
         value_vars=["active", "sedentary"],
         var_name="Classification",
@@ -88,7 +107,7 @@ def activities(df: pd.DataFrame):
     melted = melted[melted["Value"] == True]
 
     # Calculate percentages
-    counts = (
+    return (
         melted.groupby(["activity_level", "Classification"])
         .size()
         .div(len(df))
@@ -96,52 +115,46 @@ def activities(df: pd.DataFrame):
         .reset_index(name="Percentage")
     )
 
-    # Plot as vertical grouped bars
-    fig = px.bar(
-        counts,
-        x="activity_level",
-        y="Percentage",
-        color="Classification",
-        barmode="group",
-        text="Percentage",
-        color_discrete_map={"active": "#59a14f", "sedentary": "#e15759"},
-        title="Active vs. Sedentary by Physical Activity Duration",
-        labels={"activity_level": "Weekly Activity Duration"},
-    )
-
-    fig.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
-
-    fig.update_layout(
-        xaxis_title=None,
-        yaxis_title="Percentage of People",
-        margin=dict(t=40, b=40),
-        legend_title_text="",
-    )
 
-    st.plotly_chart(fig, use_container_width=True)
-
-
-def sitting_time(df: pd.DataFrame):
-    st.subheader("🪑 Sitting Time Category vs Excessiveness")
+@node(["activity_level", "active", "sedentary"])
+def activities(df: pd.DataFrame):
+    st.subheader("🏃 Active and Sedentary Classification by Weekly Activity Duration")
 
-    # Define label map and order
-    freq_label_map = {
-        "lt_2h": "Less than 2 hours",
-        "lt_4h": "Less than 4 hours",
-        "lt_6h": "Less than 6 hours",
-        "gt_6h": "More than 6 hours",
-    }
-    label_order = list(freq_label_map.values())
-
-    # Replace labels
-    df["sit_down_time_daily"] = df["sit_down_time_daily"].replace(freq_label_map)
-    df["sit_down_time_daily"] = pd.Categorical(
-        df["sit_down_time_daily"], categories=label_order, ordered=True
-    )
+    counts = activity_shares(df)
 
+    # Plot as vertical grouped bars
+    def build(counts):
+        fig = px.bar(
+            counts,
+            x="activity_level",
+            y="Percentage",
+            color="Classification",
+            barmode="group",
+            text="Percentage",
+            color_discrete_map={"active": "#59a14f", "sedentary": "#e15759"},
+            title="Active vs. Sedentary by Physical Activity Duration",
+            labels={"activity_level": "Weekly Activity Duration"},
+        )
+
+        fig.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+
+        fig.update_layout(
+            xaxis_title=None,
+            yaxis_title="Percentage of People",
+            margin=dict(t=40, b=40),
+            legend_title_text="",
+        )
+        return fig
+
+    plot(counts, build, group="Classification", y="Percentage", text="Percentage")
+
+
+@prepared
+def sitting_shares(df: pd.DataFrame) -> pd.DataFrame:
     # Group and count
     counts = (
-        df.groupby(["sit_down_time_daily", "excessive_sit_down_time"])
+        df[["sitting_time", "excessive_sit_down_time"]]
+        .groupby(["sitting_time", "excessive_sit_down_time"])
         .size()
         .reset_index(name="count")
     )
@@ -149,69 +162,100 @@ def sitting_time(df: pd.DataFrame):
     # Compute % of total population
     total = counts["count"].sum()
     counts["percent"] = (counts["count"] / total * 100).round(1)
+    return counts
+
+
+@node(["sitting_time", "excessive_sit_down_time"])
+def sitting_time(df: pd.DataFrame):
+    st.subheader("🪑 Sitting Time Category vs Excessiveness")
+
+    counts = sitting_shares(df)
 
     # Plot
-    fig = px.bar(
-        counts,
-        x="sit_down_time_daily",
+    def build(counts):
+        fig = px.bar(
+            counts,
+            x="sitting_time",
+            y="percent",
+            color="excessive_sit_down_time",
+            barmode="group",
+            title="Sitting Time vs Excessive Sitting Classification",
+            color_discrete_map={True: "#e15759", False: "#59a14f"},
+            labels={
+                "sitting_time": "Sitting Time Category",
+                "excessive_sit_down_time": "Excessive Sitting",
+                "percent": "Percentage of People",
+            },
+        )
+
+        fig.update_layout(
+            yaxis=dict(range=[0, 100]),
+        )
+        return fig
+
+    plot(
+        counts.drop(columns="count"),
+        build,
+        group="excessive_sit_down_time",
         y="percent",
-        color="excessive_sit_down_time",
-        barmode="group",
-        title="Sitting Time vs Excessive Sitting Classification",
-        color_discrete_map={True: "#e15759", False: "#59a14f"},
-        labels={
-            "sit_down_time_daily": "Sitting Time Category",
-            "excessive_sit_down_time": "Excessive Sitting",
-            "percent": "Percentage of People",
-        },
     )
 
-    fig.update_layout(
-        yaxis=dict(range=[0, 100]),
-    )
 
-    st.plotly_chart(fig, use_container_width=True)
+# Define the pain columns to process
+PAIN_COLUMNS = {
+    "back_pain_weekly": ("Back Pain", "#4e79a7"),
+    "body_pain_weekly": ("Body Pain", "#f28e2b"),
+    "headache_weekly": ("Headache", "#e15759"),
+}
 
 
+@prepared
+def pain_shares(df: pd.DataFrame) -> pd.DataFrame:
+    # Every day 0–7 is on the scale, so the x-axis includes them all
+    shares = pd.DataFrame(
+        {
+            label: distribution(df, col, normalize=True) * 100
+            for col, (label, _) in PAIN_COLUMNS.items()
+            if col in df.columns
+        }
+    )
+    shares = shares.rename_axis("Days").reset_index()
+    return shares.melt(id_vars="Days", var_name="Pain", value_name="Percent")
+
+
+@node(list(PAIN_COLUMNS))
 def pain(df: pd.DataFrame):
     st.subheader("🩻 Weekly Pain Frequency")
 
-    # Define the pain columns to process
-    pain_columns = {
-        "back_pain_weekly": ("Back Pain", "#4e79a7"),
-        "body_pain_weekly": ("Body Pain", "#f28e2b"),
-        "headache_weekly": ("Headache", "#e15759"),
-    }
-
-    # Ensure x-axis includes all days 0–7
-    index = pd.Index(range(8), name="Days")
-
-    fig = go.Figure()
-
-    for col, (label, color) in pain_columns.items():
-        if col in df.columns:
-            counts = df[col].value_counts(normalize=True).sort_index() * 100
-            counts = counts.reindex(index, fill_value=0)
-            fig.add_trace(
-                go.Scatter(
-                    x=counts.index,
-                    y=counts.values,
-                    mode="lines+markers",
-                    name=label,
-                    line=dict(color=color),
+    shares = pain_shares(df)
+
+    def build(shares):
+        fig = go.Figure()
+
+        for label, color in PAIN_COLUMNS.values():
+            counts = shares[shares["Pain"] == label]
+            if not counts.empty:
+                fig.add_trace(
+                    go.Scatter(
+                        x=counts["Days"],
+                        y=counts["Percent"],
+                        mode="lines+markers",
+                        name=label,
+                        line=dict(color=color),
+                    )
                 )
-            )
-
-    fig.update_layout(
-        title="Weekly Pain: Percentage of People by Days per Week",
-        xaxis_title="Days per Week with Pain",
-        yaxis_title="Percentage of People",
-        xaxis=dict(dtick=1),
-        yaxis=dict(range=[0, 100]),
-        hovermode="x unified",
-    )
 
-    st.plotly_chart(fig, use_container_width=True)
+        fig.update_layout(
+            title="Weekly Pain: Percentage of People by Days per Week",
+            xaxis_title="Days per Week with Pain",
+            yaxis_title="Percentage of People",
+            xaxis=dict(dtick=1),
+            yaxis=dict(range=[0, 100]),
+            hovermode="x unified",
+        )
+        return fig
+
+    plot(shares, build, group="Pain", y="Percent")
 
 
 def show(df: pd.DataFrame):
@@ -0,0 +1,263 @@
+import numpy as np
+import pandas as pd
+
+
+# --- Yes/No survey flags ---
+BOOL_COLUMNS = [
+    "healthy_weight",
+    "obesity",
+    "active",
+    "sedentary",
+    "headache",
+    "migraine",
+    "excessive_sit_down_time",
+    "apnea",
+    "sleepness_day_time",
+    "wake_up_tired",
+    "sleep_break",
+    "snore",
+    "insomnia",
+    "burnout",
+    "forgetfulness",
+    "work_satisfaction",
+    "suicide_risk",
+    "anxiety",
+    "depression",
+    "is_isolated",
+    "is_socially_active",
+    "isolation",
+    "low_quality_of_life",
+    "meaningful_life",
+    "meaningless_life",
+    "socialization",
+    "spirituality",
+    "household_situation_alone",
+    "household_situation_adults",
+    "household_situation_parents",
+    "household_situation_partner",
+    "household_situation_pet",
+    "self_eval_nutrition",
+    "eat_fibers",
+    "eat_fruits",
+    "eat_vegetables",
+    "good_water_intake",
+    "high_fast_food_intake",
+    "high_processed_intake",
+    "high_sodium_intake",
+    "high_soft_drink_intake",
+    "high_cholesterol",
+    "debt",
+    "emergency_reserve",
+    "investments",
+    "savings_money",
+    "unexpected_expenses",
+    "constipation",
+    "smoker",
+    "quit_smoking",
+    "use_medication",
+    "polypharmacy",
+    "medication_antidepressants",
+    "medication_antipsychotics",
+    "medication_anxiolytic",
+    "medication_for_sleep",
+    "medication_for_weight_loss",
+    "appointments_dentist",
+    "appointments_generalist",
+    "appointments_nutritionist",
+    "appointments_psychologist",
+    "clean_family_history",
+    "clean_medical_history",
+    "high_cvd_risk",
+    "diabetes",
+    "diabetes_lack_exams",
+    "lack_exams_general",
+    "cancer_lack_exams",
+    "cardio_lack_exams",
+]
+
+# --- Small ordinal scores (self evaluations, days per week) ---
+ORDINAL_COLUMNS = [
+    "self_eval_health_quality",
+    "self_eval_health_general",
+    "self_eval_sleep_quality",
+    "self_eval_mental_well_being",
+    "self_eval_nutrition_well_being",
+    "self_eval_finance_well_being",
+    "headache_weekly",
+    "back_pain_weekly",
+    "body_pain_weekly",
+]
+
+# --- Enumerated answers ---
+CATEGORY_COLUMNS = [
+    "education_level",
+    "work_model",
+    "marital_status",
+    "race",
+    "biological_sex",
+    "health_insurance",
+    "bmi_category",
+    "physical_activities",
+    "sit_down_time_daily",
+    "fast_food",
+    "fibers",
+    "fruits",
+    "processed",
+    "soft_drink",
+    "vegetables",
+    "water_intake",
+    "emergency_reserve_savings_period",
+    "bowel_movements",
+]
+
+# --- Continuous measurements ---
+FLOAT_COLUMNS = [
+    "age",
+    "heart_age",
+    "years_lost",
+    "height",
+    "weight",
+    "bmi",
+    "sleep_hours",
+]
+
+# --- Response identity, kept for incremental ETL runs ---
+ID_COLUMNS = {
+    "patient_id": "Int64",
+    "updated_at": "datetime64[ns]",
+}
+
+# --- Ordered answer scales: stored value -> chart label, in scale order ---
+WELL_BEING = {score: score for score in range(-5, 6)}
+RATING = {score: score for score in range(0, 11)}
+DAYS_PER_WEEK = {days: days for days in range(0, 8)}
+FOOD_FREQUENCY = {
+    "none": "None",
+    "lt_2": "1-2x/week",
+    "gt_3": "3-5x/week",
+    "gt_5": "6-7x/week",
+}
+WATER_INTAKE = {
+    "lt_500": "Very Low",
+    "lt_1000": "Low",
+    "lt_1500": "Medium",
+    "gt_1500": "Adequate",
+    "gt_2000": "Optimal",
+}
+RESERVE_PERIOD = {
+    "none": "No Reserve",
+    "lt_3_w": "<3 weeks",
+    "lt_8_w": "<8 weeks",
+    "lt_20_w": "<20 weeks",
+    "gt_24_w": "24+ weeks",
+}
+# WHO hour-based labels
+ACTIVITY = {
+    "none": "0 min / week",
+    "low": "Less than 150min / week",
+    "moderate": "More than 150min / week",
+    "high": "More than 240min / week",
+}
+SITTING_TIME = {
+    "lt_2h": "Less than 2 hours",
+    "lt_4h": "Less than 4 hours",
+    "lt_6h": "Less than 6 hours",
+    "gt_6h": "More than 6 hours",
+}
+
+SCALES = {
+    "self_eval_mental_well_being": WELL_BEING,
+    "self_eval_nutrition_well_being": WELL_BEING,
+    "self_eval_finance_well_being": WELL_BEING,
+    "self_eval_sleep_quality": RATING,
+    "headache_weekly": DAYS_PER_WEEK,
+    "back_pain_weekly": DAYS_PER_WEEK,
+    "body_pain_weekly": DAYS_PER_WEEK,
+    "fast_food": FOOD_FREQUENCY,
+    "fibers": FOOD_FREQUENCY,
+    "fruits": FOOD_FREQUENCY,
+    "processed": FOOD_FREQUENCY,
+    "soft_drink": FOOD_FREQUENCY,
+    "vegetables": FOOD_FREQUENCY,
+    "water_intake": WATER_INTAKE,
+    "emergency_reserve_savings_period": RESERVE_PERIOD,
+    "physical_activities": ACTIVITY,
+    "sit_down_time_daily": SITTING_TIME,
+}
+
+DTYPES = {
+    **ID_COLUMNS,
+    **{col: "boolean" for col in BOOL_COLUMNS},
+    # Nullable so unanswered scores survive the cast
+    **{col: "Int8" for col in ORDINAL_COLUMNS},
+    **{col: "category" for col in CATEGORY_COLUMNS},
+    **{col: "float32" for col in FLOAT_COLUMNS},
+}
+
+
+def infer(s: pd.Series, sample: bool = False) -> str:
+    # Fallback for the processed columns no chart declares above. A `sample`
+    # holds only part of a column, so numbers keep room for unseen values.
+    values = s.dropna()
+    if values.empty:
+        # Nothing to go on; a sample leaves room for numbers in later rows
+        return "float32" if sample else str(s.dtype)
+    # Only real booleans: 0/1 counts compare equal to False/True
+    if pd.api.types.is_bool_dtype(s) or (
+        s.dtype == object
+        and all(isinstance(v, (bool, np.bool_)) for v in values.unique())
+    ):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(s):
+        if pd.api.types.is_float_dtype(s) and sample:
+            return "float32"
+        if not (values == np.round(values)).all():
+            return "float32"
+        for dtype in ["Int32"] if sample else ["Int8", "Int16", "Int32"]:
+            info = np.iinfo(dtype.lower())
+            if info.min <= values.min() and values.max() <= info.max:
+                return dtype
+        return "Int64"
+    if values.nunique() <= len(values) // 2:
+        return "category"
+    return str(s.dtype)
+
+
+def dtypes(df: pd.DataFrame, sample: bool = False, stored: dict = None) -> dict:
+    # `stored` dtypes were inferred once for the whole dataset (see etl.py);
+    # only columns they don't name are inferred from `df`
+    stored = stored or {}
+    return {
+        col: DTYPES.get(col) or stored.get(col) or infer(df[col], sample)
+        for col in df.columns
+    }
+
+
+def ordered(s: pd.Series) -> pd.Series:
+    # Category codes follow the declared scale, so the codes are the scale
+    # positions; answers outside the scale are kept after it
+    table = SCALES.get(s.name)
+    if table is None or not isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    extra = [value for value in s.cat.categories if value not in table]
+    return s.cat.set_categories([*table, *extra], ordered=True)
+
+
+def apply(df: pd.DataFrame, stored: dict = None) -> pd.DataFrame:
+    df = df.astype(dtypes(df, stored=stored))
+    for col in df.columns.intersection(list(SCALES)):
+        df[col] = ordered(df[col])
+    return df
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    report = pd.DataFrame(
+        {
+            "dtype_before": before.dtypes.astype(str),
+            "dtype_after": after.dtypes.astype(str),
+            "mb_before": before.memory_usage(index=False, deep=True) / 2**20,
+            "mb_after": after.memory_usage(index=False, deep=True) / 2**20,
+        }
+    )
+    report["ratio"] = (report["mb_before"] / report["mb_after"]).round(1)
+    return report.sort_values("mb_before", ascending=False)
@@ -1,78 +1,157 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 from .health_dash import template
+from .aggregate import distribution, symptoms
+from .figures import plot
+from .graph import node
+from .memo import prepared
+from . import detail
 import plotly.express as px
+import plotly.graph_objects as go
 
 
+@node(["self_eval_sleep_quality"])
 def sleep_eval(df: pd.DataFrame):
     st.subheader("😴 Self-Evaluated Sleep Quality")
 
     # Compute percentage per rating
     quality_counts = (
-        df["self_eval_sleep_quality"]
-        .value_counts(normalize=True)
-        .sort_index()
+        distribution(df, "self_eval_sleep_quality", normalize=True)
         .mul(100)
         .reset_index()
     )
     quality_counts.columns = ["Rating", "Percentage"]
 
-    fig = px.bar(
-        quality_counts,
-        x="Rating",
-        y="Percentage",
-        text="Percentage",
-        title="Sleep Quality Distribution (0–10)",
-        labels={"Rating": "Quality Rating", "Percentage": "Percentage of People"},
+    def build(quality_counts):
+        fig = px.bar(
+            quality_counts,
+            x="Rating",
+            y="Percentage",
+            text="Percentage",
+            title="Sleep Quality Distribution (0–10)",
+            labels={"Rating": "Quality Rating", "Percentage": "Percentage of People"},
+        )
+
+        fig.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+
+        fig.update_layout(
+            yaxis=dict(visible=False),
+            xaxis_title="Quality Rating",
+            margin=dict(t=40, b=30),
+        )
+        return fig
+
+    plot(quality_counts, build, y="Percentage", text="Percentage")
+
+
+@prepared
+def sleep_summary(df: pd.DataFrame) -> tuple:
+    hours = df["sleep_hours"].to_numpy(dtype="float64", na_value=np.nan)
+    return detail.density(hours), detail.quantiles(hours)
+
+
+def sleep_figure(df: pd.DataFrame, mode: str):
+    title = "Distribution of Sleep Duration (Hours per Night)"
+    color = "#59a14f"
+    if mode == "points":
+        fig = px.violin(
+            df[["sleep_hours"]],
+            y="sleep_hours",
+            box=False,  # remove the box
+            points="all",
+            title=title,
+            labels={"sleep_hours": "Hours of Sleep"},
+            color_discrete_sequence=[color],
+        )
+        fig.update_layout(yaxis=dict(dtick=1))
+        return fig
+
+    # The violin outline from a server-side KDE, and its quartile box
+    curve, box = sleep_summary(df)
+    width = 0.4 / max(curve["density"].max(), 1e-12)
+    outline = curve["density"].to_numpy() * width
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=np.concatenate([outline, -outline[::-1]]).round(4),
+            y=np.concatenate([curve["value"], curve["value"][::-1]]).round(3),
+            fill="toself",
+            mode="lines",
+            line=dict(color=color),
+            hoverinfo="skip",
+        )
     )
-
-    fig.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
-
+    if mode == "webgl":
+        # Every respondent as a WebGL point, jittered across the outline
+        hours = df["sleep_hours"].dropna().to_numpy()
+        jitter = np.random.default_rng(0).uniform(-0.15, 0.15, len(hours))
+        fig.add_trace(
+            go.Scattergl(
+                x=jitter.round(2),
+                y=hours,
+                mode="markers",
+                marker=dict(color=color, size=3, opacity=0.4),
+                hovertemplate="%{y} h<extra></extra>",
+            )
+        )
+    elif not box.empty:
+        fig.add_trace(
+            go.Box(
+                x=[0],
+                q1=[box["q1"]],
+                median=[box["median"]],
+                q3=[box["q3"]],
+                lowerfence=[box["lowerfence"]],
+                upperfence=[box["upperfence"]],
+                mean=[box["mean"]],
+                width=0.08,
+                fillcolor="white",
+                line=dict(color="black", width=1),
+                hoverinfo="y",
+            )
+        )
     fig.update_layout(
-        yaxis=dict(visible=False),
-        xaxis_title="Quality Rating",
-        margin=dict(t=40, b=30),
+        title=title,
+        yaxis=dict(dtick=1, title="Hours of Sleep"),
+        xaxis=dict(visible=False, range=[-0.5, 0.5]),
+        showlegend=False,
     )
-
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
+@node(["sleep_hours"])
 def sleep_duration(df: pd.DataFrame):
     st.subheader("⏱️ Sleep Duration")
-    st.markdown(
-        "Each point is a person — the wider the shape, the more people sleep that number of hours."
-    )
-
-    fig = px.violin(
-        df,
-        y="sleep_hours",
-        box=False,  # remove the box
-        points="all",
-        title="Distribution of Sleep Duration (Hours per Night)",
-        labels={"sleep_hours": "Hours of Sleep"},
-        color_discrete_sequence=["#59a14f"],
-    )
-    fig.update_layout(yaxis=dict(dtick=1))
-    st.plotly_chart(fig, use_container_width=True)
-
-
-def sleep_disturbances(df: pd.DataFrame):
-    st.subheader("🌙 Sleep-Related Symptoms")
-
-    bool_columns = [
-        "apnea",
-        "sleepness_day_time",
-        "wake_up_tired",
-        "sleep_break",
-        "snore",
-        "insomnia",
-    ]
-
-    # Melt into long format
-    melted = df[bool_columns].melt(var_name="Symptom", value_name="Present")
+    mode = detail.level(len(df))
+    if mode == "summary":
+        st.markdown(
+            "The wider the shape, the more people sleep that number of hours; "
+            "the box marks the middle half of respondents and the median."
+        )
+    else:
+        st.markdown(
+            "Each point is a person — the wider the shape, the more people sleep that number of hours."
+        )
+
+    st.plotly_chart(sleep_figure(df, mode), use_container_width=True)
+
+
+SYMPTOMS = [
+    "apnea",
+    "sleepness_day_time",
+    "wake_up_tired",
+    "sleep_break",
+    "snore",
+    "insomnia",
+]
+
+
+@prepared
+def symptom_shares(df: pd.DataFrame, basis: str = "mentions") -> pd.DataFrame:
     symptom_counts = (
-        melted[melted["Present"] == True]["Symptom"]
-        .value_counts(normalize=True)
+        symptoms(df, SYMPTOMS)[basis]
+        .sort_values(ascending=False, kind="stable")
         .mul(100)
         .round(1)
         .reset_index()
@@ -87,29 +166,49 @@ def sleep_disturbances(df: pd.DataFrame):
     symptom_counts["Symptom"] = pd.Categorical(
         symptom_counts["Symptom"], categories=symptom_counts["Symptom"], ordered=True
     )
+    return symptom_counts
 
-    fig = px.bar(
-        symptom_counts,
-        y="Symptom",
-        x="Percentage",
-        orientation="h",
-        text="Percentage",
-        title="Prevalence of Sleep-Related Symptoms",
-    )
 
-    fig.update_traces(
-        marker_color="#4e79a7", texttemplate="%{text:.1f}%", textposition="outside"
-    )
+# A fragment: switching the share only redraws this chart
+@st.fragment
+@node(SYMPTOMS, widgets=["sleep_symptom_basis"])
+def sleep_disturbances(df: pd.DataFrame):
+    st.subheader("🌙 Sleep-Related Symptoms")
 
-    fig.update_layout(
-        showlegend=False,
-        xaxis_title=None,
-        yaxis_title=None,
-        yaxis=dict(categoryorder="total ascending"),
-        margin=dict(t=40, b=30, l=10, r=10),
+    basis = st.radio(
+        "Share of",
+        ["mentions", "respondents"],
+        format_func=str.capitalize,
+        horizontal=True,
+        key="sleep_symptom_basis",
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    symptom_counts = symptom_shares(df, basis)
+
+    def build(symptom_counts):
+        fig = px.bar(
+            symptom_counts,
+            y="Symptom",
+            x="Percentage",
+            orientation="h",
+            text="Percentage",
+            title="Prevalence of Sleep-Related Symptoms",
+        )
+
+        fig.update_traces(
+            marker_color="#4e79a7", texttemplate="%{text:.1f}%", textposition="outside"
+        )
+
+        fig.update_layout(
+            showlegend=False,
+            xaxis_title=None,
+            yaxis_title=None,
+            yaxis=dict(categoryorder="total ascending"),
+            margin=dict(t=40, b=30, l=10, r=10),
+        )
+        return fig
+
+    plot(symptom_counts, build, x="Percentage", text="Percentage")
 
 
 def show(df: pd.DataFrame):
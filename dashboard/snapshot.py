@@ -0,0 +1,162 @@
+import json
+import logging
+import mmap
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from . import derived, flags, index, schema, storage
+from .categories import CATEGORIES
+from .cube import DIMENSIONS, CountCube
+
+logger = logging.getLogger(__name__)
+
+# --- Build-Time Snapshot ---
+# Everything a replica would otherwise build on its first requests: the
+# typed dataset with its derived columns (flags packed to bits), the
+# sidebar filter index and the count cube of every category. Written once
+# (e.g. while building the image) and memory-mapped on start, so arrays are
+# paged in from the file as charts touch them instead of being read,
+# decoded and aggregated.
+SNAPSHOT_PATH = "snapshot.bin"
+FORMAT = 5
+# Array buffers start on cache-line boundaries
+ALIGN = 64
+
+
+def write(path: str, version: str, contents: dict):
+    # Pickle protocol 5 hands out numpy buffers separately: they are written
+    # after the pickle stream, where loading can map them without copying
+    buffers = []
+    stream = pickle.dumps(contents, protocol=5, buffer_callback=buffers.append)
+    views = [buffer.raw() for buffer in buffers]
+    header = {"format": FORMAT, "version": version, "pickle": len(stream)}
+    offset = 0
+    header["buffers"] = []
+    for view in views:
+        header["buffers"].append((offset, view.nbytes))
+        offset += -(-view.nbytes // ALIGN) * ALIGN
+    head = json.dumps(header).encode()
+    start = -(-(8 + len(head) + len(stream)) // ALIGN) * ALIGN
+    with open(path + ".tmp", "wb") as f:
+        f.write(len(head).to_bytes(8, "little"))
+        f.write(head)
+        f.write(stream)
+        for (position, _), view in zip(header["buffers"], views):
+            f.seek(start + position)
+            f.write(view)
+    # Readers never see a half-written snapshot
+    os.replace(path + ".tmp", path)
+
+
+def _header(mapped) -> tuple:
+    size = int.from_bytes(mapped[:8], "little")
+    header = json.loads(mapped[8 : 8 + size])
+    if header["format"] != FORMAT:
+        raise ValueError(f"Snapshot format {header['format']}, expected {FORMAT}")
+    return header, 8 + size
+
+
+def _map(path: str) -> mmap.mmap:
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def version(path: str = SNAPSHOT_PATH) -> str:
+    return _header(_map(path))[0]["version"]
+
+
+def read(path: str) -> tuple:
+    mapped = _map(path)
+    header, stream = _header(mapped)
+    start = -(-(stream + header["pickle"]) // ALIGN) * ALIGN
+    memory = memoryview(mapped)
+    buffers = [
+        memory[start + offset : start + offset + nbytes]
+        for offset, nbytes in header["buffers"]
+    ]
+    contents = pickle.loads(memory[stream : stream + header["pickle"]], buffers=buffers)
+    return header["version"], contents
+
+
+def build(dataset, path: str = SNAPSHOT_PATH) -> str:
+    stored = [col for col in dataset.columns if col not in derived.COLUMNS]
+    columns = stored + [col for col in derived.COLUMNS if col not in stored]
+    df = dataset[columns]
+    packed = [col for col in columns if flags.is_flag(df[col])]
+    cubes = {
+        cat["name"]: CountCube(df[list(dict.fromkeys(DIMENSIONS + cat["columns"]))])
+        for cat in CATEGORIES
+        if cat["columns"] is not None
+    }
+    contents = {
+        "columns": stored,
+        "data": df.drop(columns=packed),
+        "flags": {col: flags.pack(df[col]) for col in packed},
+        "index": index.FilterIndex(df[index.COLUMNS]),
+        "cubes": cubes,
+    }
+    write(path, dataset.version, contents)
+    return dataset.version
+
+
+# Stands in for storage.LazyDataset when a snapshot is found: every column
+# is already mapped, flags as packed bits that frames get unpacked, and the
+# prebuilt filter index and cubes come along
+class SnapshotDataset:
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self.version, contents = read(path)
+        # Stored columns shown to viewers; the derived ones are in `data`
+        # but not listed
+        self.stored = pd.Index(contents["columns"]).drop(
+            list(schema.ID_COLUMNS), errors="ignore"
+        )
+        self.data = contents["data"]
+        self.flags = contents["flags"]
+        self.index = contents["index"]
+        self.cubes = contents["cubes"]
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.stored
+
+    @property
+    def shape(self) -> tuple:
+        return len(self), len(self.stored)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, columns) -> pd.DataFrame:
+        if not any(col in self.flags for col in columns):
+            return self.data[columns]
+        return pd.concat([self._series(col) for col in columns], axis=1)
+
+    def packed(self, col: str) -> flags.Packed:
+        if col in self.flags:
+            return self.flags[col]
+        return flags.pack(self.data[col])
+
+    def _series(self, col: str, rows: np.ndarray = None) -> pd.Series:
+        if col not in self.flags:
+            return self.data[col] if rows is None else self.data[col].iloc[rows]
+        values = flags.unpack(self.flags[col], rows)
+        return pd.Series(values, index=rows, name=col)
+
+    def sample(self, n: int) -> pd.DataFrame:
+        rows = np.sort(np.random.default_rng().choice(len(self), n, replace=False))
+        return pd.concat([self._series(col, rows) for col in self.stored], axis=1)
+
+
+def load(path: str = SNAPSHOT_PATH):
+    # The snapshot when there is one and the store has not moved on since
+    # (an image holds only the snapshot); the lazily loaded store otherwise
+    if not os.path.exists(path):
+        return storage.LazyDataset()
+    live = storage.LazyDataset()
+    if storage.files(live.path) or os.path.exists(storage.CSV_PATH):
+        if live.version != version(path):
+            logger.info("Snapshot %s is stale, loading the store", version(path))
+            return live
+    return SnapshotDataset(path)
@@ -0,0 +1,332 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+from . import derived, flags, memo, schema
+
+logger = logging.getLogger(__name__)
+
+CSV_PATH = "processed.csv"
+PARQUET_PATH = "processed.parquet"
+# Month-partitioned output of `etl.py`
+DATASET_PATH = "processed"
+# Kept by `etl.py` next to the partitions: its watermark, and the dtypes
+# every partition is written with
+STATE_FILE = "_state.json"
+
+# A Parquet file as last seen on disk; a rewrite changes its mtime
+Part = namedtuple("Part", ["file", "mtime", "rows"])
+
+# Copy-on-Write is always on from pandas 3; older releases have to opt in so
+# frames built over the cached columns can never write through to them
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def write(df: pd.DataFrame, path: str = PARQUET_PATH):
+    schema.apply(df).to_parquet(path, index=False, compression="zstd")
+
+
+def read(columns=None, path: str = PARQUET_PATH, dtypes: dict = None) -> pd.DataFrame:
+    # Fall back to the text export until the notebook has written the store.
+    # A partition is read with its dataset's stored `dtypes`, so partitions
+    # don't each infer their own
+    if not os.path.exists(path):
+        raw = pd.read_csv(CSV_PATH, usecols=columns)
+    else:
+        raw = pd.read_parquet(path, columns=columns)
+    df = schema.apply(raw, dtypes)
+
+    if logger.isEnabledFor(logging.INFO):
+        report = schema.memory_report(raw, df)
+        logger.info(
+            "Loaded %d columns: %.1f MB -> %.1f MB",
+            len(report),
+            report["mb_before"].sum(),
+            report["mb_after"].sum(),
+        )
+        logger.debug("Memory per column:\n%s", report.to_string())
+    return df
+
+
+def load_state(path: str):
+    # None for a single file, or a dataset `etl.py` hasn't finished yet
+    file = os.path.join(path, STATE_FILE)
+    if not os.path.isfile(file):
+        return None
+    with open(file) as f:
+        return json.load(f)
+
+
+def files(path: str) -> list:
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "**", "*.parquet"), recursive=True))
+    return [path] if os.path.exists(path) else []
+
+
+# Filtered columns per (column, canonical filter key), shared by the views
+# of every session on the same cohort
+TAKEN = memo.PrepCache(max_mb=256)
+
+
+# A tab's rows and columns without copying them: columns are filtered the
+# first time a chart asks for them, and a DataFrame is only built when a
+# chart passes a column list to a plotting or groupby call. `cohort`
+# describes the rows for the aggregation helpers; subsets drop it.
+class CategoryView:
+    def __init__(self, source, columns: list, rows=None, cohort=None):
+        self.source = source
+        self.columns = pd.Index(columns)
+        # Row positions: taking them is cheaper than boolean indexing, and
+        # every filtered column shares the one index built from them. None
+        # (or every row) hands out the dataset's own columns
+        if rows is not None and len(rows) == len(source):
+            rows = None
+        self.rows = rows
+        self.index = None if rows is None else pd.Index(rows, copy=False)
+        self.cohort = cohort
+        self._series = {}
+
+    def __len__(self) -> int:
+        return len(self.source) if self.rows is None else len(self.rows)
+
+    @property
+    def shape(self) -> tuple:
+        return len(self), len(self.columns)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if self.rows is None:
+                # Shared with the dataset; flags are unpacked for the caller
+                return self.source[[key]][key]
+            if key not in self._series:
+                if self.cohort is None:
+                    self._series[key] = self._take(key)
+                else:
+                    self._series[key] = TAKEN.get(
+                        (key, self.cohort.key),
+                        self.cohort.version,
+                        lambda: self._take(key),
+                    )
+            return self._series[key]
+        if isinstance(key, list):
+            return pd.concat([self[col] for col in key], axis=1)
+        # A boolean Series over this view's rows (missing counts as False):
+        # narrow the selection
+        if isinstance(key, pd.Series):
+            key = key.to_numpy(dtype=bool, na_value=False)
+        if self.rows is None:
+            return CategoryView(self.source, list(self.columns), np.flatnonzero(key))
+        return CategoryView(self.source, list(self.columns), self.rows[key])
+
+    def _take(self, key: str) -> pd.Series:
+        values = self.source[[key]][key].array.take(self.rows)
+        return pd.Series(values, index=self.index, name=key)
+
+    def sample(self, n: int) -> pd.DataFrame:
+        rows = np.arange(len(self)) if self.rows is None else self.rows
+        rows = np.random.default_rng().choice(rows, min(n, len(self)), False)
+        return self.source[list(self.columns)].iloc[np.sort(rows)]
+
+
+# Reads columns from storage on first use and keeps the most recently used
+# ones in memory, up to `max_mb`. Boolean flags are kept packed to bits (see
+# flags.py) and only unpacked into the frames asked for. When `etl.py`
+# rewrites partitions, only those partitions are read again; rows from the
+# others are reused.
+class LazyDataset:
+    def __init__(self, path: str = None, max_mb: float = 512):
+        if path is None:
+            path = DATASET_PATH if os.path.isdir(DATASET_PATH) else PARQUET_PATH
+        self.path = path
+        self.max_bytes = max_mb * 2**20
+        self._cache = OrderedDict()
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def _parts(self) -> tuple:
+        parts = []
+        for file in files(self.path):
+            mtime = os.stat(file).st_mtime_ns
+            if (file, mtime) not in self._rows:
+                self._rows[file, mtime] = pq.read_metadata(file).num_rows
+            parts.append(Part(file, mtime, self._rows[file, mtime]))
+        return tuple(parts)
+
+    @property
+    def version(self) -> str:
+        # Changes whenever a partition is added, rewritten or removed
+        parts = self._parts() or os.stat(CSV_PATH).st_mtime_ns
+        return hashlib.sha1(repr(parts).encode()).hexdigest()[:12]
+
+    @property
+    def columns(self) -> pd.Index:
+        # The response identity is there for the ETL, not for viewers
+        parts = self._parts()
+        if parts:
+            names = pd.Index(pq.read_schema(parts[0].file).names)
+        else:
+            names = pd.read_csv(CSV_PATH, nrows=0).columns
+        return names.drop(list(schema.ID_COLUMNS), errors="ignore")
+
+    @property
+    def shape(self) -> tuple:
+        return len(self), len(self.columns)
+
+    def __len__(self) -> int:
+        parts = self._parts()
+        if parts:
+            return sum(part.rows for part in parts)
+        return len(self[[self.columns[0]]])
+
+    def __getitem__(self, columns) -> pd.DataFrame:
+        with self._lock:
+            self._use(columns)
+            # concat shares the cached buffers instead of copying them
+            df = pd.concat([self._series(col) for col in columns], axis=1)
+        return df
+
+    def packed(self, col: str) -> flags.Packed:
+        with self._lock:
+            self._use([col])
+            value = self._cache[col][1]
+        return value if isinstance(value, flags.Packed) else flags.pack(value)
+
+    def _use(self, columns: list):
+        parts = self._parts()
+        stale = [
+            col
+            for col in columns
+            if col not in self._cache or self._cache[col][0] != parts
+        ]
+        if stale:
+            self._load(stale, parts)
+        for col in columns:
+            self._cache.move_to_end(col)
+        self._evict(keep=set(columns))
+
+    def _series(self, col: str) -> pd.Series:
+        value = self._cache[col][1]
+        if isinstance(value, flags.Packed):
+            return pd.Series(flags.unpack(value), name=col)
+        return value
+
+    def _store(self, col: str, parts: tuple, series: pd.Series):
+        value = flags.pack(series) if flags.is_flag(series) else series
+        self._cache[col] = (parts, value)
+
+    def _load(self, columns: list, parts: tuple):
+        # Derived label columns are computed from their freshly loaded source
+        # and cached like any stored column
+        stored = [col for col in columns if col not in derived.COLUMNS]
+        sources = [
+            derived.COLUMNS[col]["source"]
+            for col in columns
+            if col in derived.COLUMNS
+        ]
+        stored += [
+            col
+            for col in dict.fromkeys(sources)
+            if col not in stored
+            and (col not in self._cache or self._cache[col][0] != parts)
+        ]
+        if stored:
+            self._read(stored, parts)
+        for col in columns:
+            if col in derived.COLUMNS:
+                source = self._series(derived.COLUMNS[col]["source"])
+                self._store(col, parts, derived.compute(col, source))
+
+    def _read(self, columns: list, parts: tuple):
+        if not parts:
+            loaded = read(columns, self.path)
+            for col in columns:
+                self._store(col, parts, loaded[col])
+            return
+
+        # Slice out the rows of partitions that are unchanged since last load
+        reuse = {}
+        for col in columns:
+            if col in self._cache:
+                old_parts = self._cache[col][0]
+                series = self._series(col)
+                offset = 0
+                for part in old_parts:
+                    reuse[col, part] = series.iloc[offset : offset + part.rows]
+                    offset += part.rows
+
+        stored = self._dtypes()
+        pieces = {col: [] for col in columns}
+        for part in parts:
+            missing = [col for col in columns if (col, part) not in reuse]
+            loaded = read(missing, part.file, stored) if missing else None
+            for col in columns:
+                piece = reuse.get((col, part))
+                pieces[col].append(loaded[col] if piece is None else piece)
+
+        for col in columns:
+            self._store(col, parts, _concat(pieces[col]))
+
+    def _dtypes(self) -> dict:
+        # What etl.py inferred once for every partition, if it wrote them
+        return (load_state(self.path) or {}).get("dtypes")
+
+    def _evict(self, keep: set):
+        size = sum(_nbytes(value) for _, value in self._cache.values())
+        for col in list(self._cache):
+            if size <= self.max_bytes:
+                break
+            if col not in keep:
+                size -= _nbytes(self._cache.pop(col)[1])
+
+    def sample(self, n: int) -> pd.DataFrame:
+        rows = np.sort(np.random.default_rng().choice(len(self), n, replace=False))
+        parts = self._parts()
+        columns = list(self.columns)
+        if parts:
+            files = ds.dataset([part.file for part in parts])
+            raw = files.take(rows, columns=columns).to_pandas()
+        else:
+            wanted = set(rows + 1)
+            raw = pd.read_csv(
+                CSV_PATH, usecols=columns, skiprows=lambda i: i > 0 and i not in wanted
+            )
+        return schema.apply(raw, self._dtypes()).set_axis(rows)
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, flags.Packed):
+        return value.bits.nbytes + value.valid.nbytes
+    return value.memory_usage(index=False)
+
+
+def _concat(pieces: list) -> pd.Series:
+    if len(pieces) == 1:
+        return pieces[0].reset_index(drop=True)
+    # Partitions carry their own category lists; merge rather than fall back
+    # to object
+    if all(isinstance(p.dtype, pd.CategoricalDtype) for p in pieces):
+        # A partition where nobody answered has no categories to give them a
+        # dtype; give it the one the others share
+        kinds = [p.cat.categories.dtype for p in pieces if len(p.cat.categories)]
+        if kinds:
+            empty = pd.Index([], dtype=kinds[0])
+            pieces = [
+                p if len(p.cat.categories) else p.cat.set_categories(empty)
+                for p in pieces
+            ]
+        values = union_categoricals(pieces, ignore_order=True)
+        return schema.ordered(pd.Series(values, name=pieces[0].name))
+    return pd.concat(pieces, ignore_index=True)
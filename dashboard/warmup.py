@@ -0,0 +1,70 @@
+import logging
+import numpy as np
+from . import cube, flags, index, memo, schema, storage
+from .categories import CATEGORIES
+from .filters import FILTERS, FilterEngine
+
+logger = logging.getLogger(__name__)
+
+# --- Startup Warm-Up ---
+# Every category rendered once per filter state before a replica takes
+# traffic: the chart data lands in the prep cache (and the shared backend,
+# where the running app finds it) as the first viewers would have left it.
+# Standard age bands, clipped to the ages in the data
+AGE_BANDS = [(18, 29), (30, 39), (40, 49), (50, 59), (60, 120)]
+
+
+def states(engine: FilterEngine) -> list:
+    # All participants, each sex, and each age band
+    specs = {spec["column"]: spec for spec in FILTERS}
+    sex, age = specs["biological_sex"], specs[index.RANGE_COLUMN]
+    low, high = engine.options(age)
+    found = [{}]
+    found += [
+        {sex["column"]: [value]}
+        for value in engine.options(sex)
+        if value != index.NOT_ANSWERED
+    ]
+    found += [
+        {age["column"]: (max(start, low), min(end, high))}
+        for start, end in AGE_BANDS
+        if start <= high and end >= low
+    ]
+    return found
+
+
+def run(dataset, filter_states: list = None, backend=None) -> int:
+    # Renders outside `streamlit run`: elements go nowhere, but every chart
+    # computes its data. Returns the number of chart data results computed
+    version = dataset.version
+    # A snapshot brings its filter index and cubes along
+    built = getattr(dataset, "index", None)
+    if built is None:
+        built = index.FilterIndex(dataset[index.COLUMNS])
+    cubes = getattr(dataset, "cubes", {})
+    engine = FilterEngine(built, version=version, backend=backend)
+    if filter_states is None:
+        filter_states = states(engine)
+    store = flags.FlagStore(dataset, schema.BOOL_COLUMNS)
+    misses = memo.CACHE.misses
+    for cat in CATEGORIES:
+        if cat["columns"] is None:
+            continue
+        counts = cubes.get(cat["name"])
+        if counts is None:
+            columns = list(dict.fromkeys(cube.DIMENSIONS + cat["columns"]))
+            counts = cube.CountCube(dataset[columns])
+        for state in filter_states:
+            selection = engine.select(state)
+            cohort = cube.Cohort(
+                counts,
+                selection.key,
+                selection.count,
+                store,
+                selection.bits,
+                version,
+            )
+            rows = np.flatnonzero(selection.mask)
+            cat["fn"](storage.CategoryView(dataset, cat["columns"], rows, cohort))
+        logger.info("Warmed %s for %d filter states", cat["name"], len(filter_states))
+    return memo.CACHE.misses - misses
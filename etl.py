@@ -0,0 +1,289 @@
+import argparse
+import itertools
+import json
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dashboard import schema, storage
+
+ANSWERS_PATH = "data/preprocessed.csv"
+ANONYMIZED_PATH = "data/anonymized_answers.csv"
+
+RENAME = {
+    "burnout_tracking": "burnout",
+    "forgetfulness_tracking": "forgetfulness",
+    "height_tracking": "height",
+    "insomnia_tracking": "insomnia",
+    "quit_smoking_tracking": "quit_smoking",
+    "smoker_tracking": "smoker",
+    "snore_tracking": "snore",
+    "wake_up_tired_tracking": "wake_up_tired",
+    "weight_tracking": "weight",
+    "work_env_stimulation_tracking": "work_env_stimulation",
+    "work_satisfaction_tracking": "work_satisfaction",
+}
+
+JOIN_COLUMNS = [
+    "birthdate",
+    "race",
+    "education_level",
+    "work_model",
+    "marital_status",
+    "biological_sex",
+    "health_insurance",
+]
+
+# `patient_id` and `updated_at` are kept: incremental runs upsert on the
+# first and use the second as their watermark
+KEY = "patient_id"
+TIMESTAMP = "updated_at"
+
+DROP = [
+    "birthdate",
+    "id_tracking",
+    "id_answers",
+    "height_answers",
+    "weight_answers",
+    "work_env_stimulation_answers",
+    "wake_up_tired_answers",
+    "snore_answers",
+    "insomnia_answers",
+    "forgetfulness_answers",
+    "work_satisfaction_answers",
+    "smoker_answers",
+    "burnout_answers",
+    "quit_smoking_answers",
+    "answers_id",
+    "social_red_flags_score",
+    "physical_red_flags_score",
+    "clinical_red_flags_score",
+    "mental_red_flags_score",
+    "nutritional_red_flags_score",
+    "sleep_red_flags_score",
+    "financial_red_flags_score",
+    "social_active_red_flags",
+    "physical_active_red_flags",
+    "clinical_active_red_flags",
+    "mental_active_red_flags",
+    "nutritional_active_red_flags",
+    "sleep_active_red_flags",
+    "financial_active_red_flags",
+    "social_health_score",
+    "physical_health_score",
+    "clinical_health_score",
+    "mental_health_score",
+    "nutritional_health_score",
+    "sleep_health_score",
+    "financial_health_score",
+    "social_health_eval",
+    "physical_health_eval",
+    "clinical_health_eval",
+    "mental_health_eval",
+    "nutritional_health_eval",
+    "sleep_health_eval",
+    "financial_health_eval",
+    "mental_well_being",
+    "nutrition_well_being",
+    "finance_well_being",
+    "health_general",
+    "health_quality",
+]
+
+
+def transform(answers: pd.DataFrame, anonymized: pd.DataFrame) -> pd.DataFrame:
+    df = answers.rename(columns=RENAME).join(anonymized[JOIN_COLUMNS])
+    df = df.drop(columns=DROP)
+    df[TIMESTAMP] = pd.to_datetime(df[TIMESTAMP], dayfirst=True)
+
+    # Decode biological sex from its JSON answer without parsing row by row.
+    # Missing or unreadable answers stay missing rather than counting as one
+    # of the two
+    answer = df["biological_sex"].astype("string")
+    female = answer.str.extract(r'"female"\s*:\s*(true|false)')[0]
+    df["biological_sex"] = female.map({"true": "Female", "false": "Male"})
+    df["health_insurance"] = np.where(df["health_insurance"] == "other", "Yes", "No")
+
+    # Appended with concat: inserting into a frame this wide fragments it
+    age = (df["heart_age"] - df["years_lost"]).rename("age")
+    df = pd.concat([df, age], axis=1)
+    return df[
+        df["age"].between(18, 120)
+        & df["height"].between(130, 250)
+        & df["weight"].between(40, 300)
+        & df["heart_age"].between(18, 120)
+    ]
+
+
+def updated_since(answers_path: str, since: pd.Timestamp, chunksize: int):
+    # Which responses were updated at or after `since`, read from the
+    # timestamp column alone
+    parts = pd.read_csv(answers_path, usecols=[TIMESTAMP], chunksize=chunksize)
+    return np.concatenate(
+        [
+            (pd.to_datetime(part[TIMESTAMP], dayfirst=True) >= since).to_numpy()
+            for part in parts
+        ]
+        or [np.zeros(0, dtype=bool)]
+    )
+
+
+def chunks(answers_path: str, anonymized_path: str, chunksize: int, since=None):
+    # Both exports list the same responses in the same order, so chunks read
+    # in lockstep share their index and join by position. With `since`, the
+    # parser skips older rows of both: the files are still scanned, but only
+    # newer rows (and rows appended since the scan) are parsed into frames
+    skip = None
+    if since is not None:
+        new = updated_since(answers_path, since, chunksize)
+        if not new.any():
+            return
+
+        def skip(row):
+            # Row 0 is the header
+            return 0 < row <= len(new) and not new[row - 1]
+
+    answers = pd.read_csv(answers_path, chunksize=chunksize, skiprows=skip)
+    anonymized = pd.read_csv(
+        anonymized_path, usecols=JOIN_COLUMNS, chunksize=chunksize, skiprows=skip
+    )
+    yield from zip(answers, anonymized)
+
+
+def typed_table(df: pd.DataFrame, dtypes: dict) -> pa.Table:
+    return pa.Table.from_pandas(df.astype(dtypes), preserve_index=False)
+
+
+def save_state(output: str, state: dict):
+    with open(os.path.join(output, storage.STATE_FILE), "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def drop_replaced(files: list, keys: pd.Series):
+    # Rewrite only the partitions holding an older version of an upserted
+    # response; every other file keeps its mtime and stays cached
+    for file in files:
+        ids = pq.read_table(file, columns=[KEY]).column(KEY).to_pandas()
+        keep = ~ids.isin(keys)
+        if keep.all():
+            continue
+        if not keep.any():
+            os.remove(file)
+            continue
+        table = pq.read_table(file).filter(pa.array(keep.to_numpy()))
+        pq.write_table(table, file + ".partial", compression="zstd")
+        os.replace(file + ".partial", file)
+
+
+def run(
+    answers_path: str = ANSWERS_PATH,
+    anonymized_path: str = ANONYMIZED_PATH,
+    output: str = storage.DATASET_PATH,
+    chunksize: int = 50_000,
+    workers: int = None,
+    incremental: bool = False,
+) -> int:
+    workers = workers or os.cpu_count()
+    state = storage.load_state(output) if incremental else None
+
+    if state is None:
+        # Full rebuild next to the live dataset, swapped in at the end
+        target = output + ".partial"
+        shutil.rmtree(target, ignore_errors=True)
+        state = {"watermark": None, "dtypes": None}
+    else:
+        target = output
+    existing = storage.files(target)
+    since = pd.Timestamp(state["watermark"]) if state["watermark"] else None
+
+    run_id = pd.Timestamp.now().strftime("%Y%m%dT%H%M%S")
+    numbers = itertools.count()
+    keys = []
+    rows = 0
+
+    def write_next():
+        df = pending.popleft().result()
+        if df.empty:
+            return 0
+        # The first chunk ever written fixes the dtypes of all later ones, so
+        # every partition shares one schema
+        if state["dtypes"] is None:
+            state["dtypes"] = {
+                col: str(dtype)
+                for col, dtype in schema.dtypes(df, sample=True).items()
+            }
+        for month, part in df.groupby(df[TIMESTAMP].dt.strftime("%Y-%m")):
+            folder = os.path.join(target, f"month={month}")
+            os.makedirs(folder, exist_ok=True)
+            file = os.path.join(folder, f"part-{run_id}-{next(numbers)}.parquet")
+            pq.write_table(
+                typed_table(part, state["dtypes"]), file, compression="zstd"
+            )
+        keys.append(df[KEY])
+        latest = df[TIMESTAMP].max()
+        if state["watermark"] is None or latest > pd.Timestamp(state["watermark"]):
+            state["watermark"] = latest.isoformat()
+        return len(df)
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        # Responses updated at the watermark itself are read again: another
+        # response may share its timestamp, and the upsert on `patient_id`
+        # replaces the copy already written
+        parts = chunks(answers_path, anonymized_path, chunksize, since)
+        for answers, anonymized in parts:
+            pending.append(pool.submit(transform, answers, anonymized))
+            # Bound memory to a couple of chunks per worker
+            if len(pending) >= 2 * workers:
+                rows += write_next()
+        while pending:
+            rows += write_next()
+
+    if keys and existing:
+        drop_replaced(existing, pd.concat(keys))
+    os.makedirs(target, exist_ok=True)
+    save_state(target, state)
+
+    if target != output:
+        # Swap the finished dataset in so a running dashboard never reads
+        # half of it
+        if os.path.exists(output):
+            os.replace(output, output + ".old")
+        os.replace(target, output)
+        shutil.rmtree(output + ".old", ignore_errors=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the dashboard dataset from the raw survey exports"
+    )
+    parser.add_argument("--answers", default=ANSWERS_PATH)
+    parser.add_argument("--anonymized", default=ANONYMIZED_PATH)
+    parser.add_argument("--output", default=storage.DATASET_PATH)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only process responses updated since the last run",
+    )
+    args = parser.parse_args()
+
+    rows = run(
+        args.answers,
+        args.anonymized,
+        args.output,
+        args.chunksize,
+        args.workers,
+        args.incremental,
+    )
+    print(f"Wrote {rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+import time
+from dashboard import snapshot, storage
+
+# Run after `etl.py` (e.g. while building the image): writes the typed
+# dataset, filter index and count cubes the app memory-maps on start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write the dashboard snapshot from the processed dataset"
+    )
+    parser.add_argument("--output", default=snapshot.SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    version = snapshot.build(storage.LazyDataset(max_mb=float("inf")), args.output)
+    print(
+        f"Wrote snapshot of dataset {version} to {args.output} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
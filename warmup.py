@@ -0,0 +1,47 @@
+import argparse
+import json
+import sys
+import time
+import streamlit.logger
+from dashboard import backends, memo, snapshot, warmup
+
+# Run after `snapshot.py` (e.g. while building the image) or against the
+# Redis cache replicas share: precomputes the chart data of the most common
+# filter states into the shared cache (DASHBOARD_CACHE).
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute chart data for common filter states"
+    )
+    parser.add_argument(
+        "--states",
+        help="JSON file with a list of filter states, e.g. "
+        '[{}, {"biological_sex": ["Female"]}, {"age": [30, 39]}]; '
+        "defaults to everyone, each sex and standard age bands",
+    )
+    args = parser.parse_args()
+    # Elements rendered outside `streamlit run` only log warnings
+    streamlit.logger.set_log_level("error")
+
+    backend = backends.connect()
+    if backend is None:
+        sys.exit(f"{backends.ENV_VAR} is not set: nothing would keep the results")
+    memo.CACHE.backend = backend
+
+    states = None
+    if args.states:
+        with open(args.states) as f:
+            states = json.load(f)
+
+    start = time.perf_counter()
+    dataset = snapshot.load()
+    computed = warmup.run(dataset, states, backend)
+    print(
+        f"Warmed {computed} chart data results for dataset {dataset.version} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()